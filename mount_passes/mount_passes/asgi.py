@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mount_passes.settings')
 
 application = get_asgi_application()
+
+# Прогрев до приёма запросов (PASS_WARM_UP): первый запрос не платит за разбор URLconf и сериализаторов
+from passes.startup import maybe_warm_up  # noqa: E402
+
+maybe_warm_up()
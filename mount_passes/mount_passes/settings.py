@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -41,7 +41,6 @@ INSTALLED_APPS = [
     'passes',
     'django_filters',
     'corsheaders',
-    'drf_yasg',
 ]
 
 MIDDLEWARE = [
@@ -75,6 +74,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'mount_passes.wsgi.application'
 
+# Прогрев воркера при загрузке wsgi/asgi (см. passes.startup.warm_up)
+PASS_WARM_UP = config('PASS_WARM_UP', default=True, cast=bool)
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -87,8 +89,68 @@ DATABASES = {
         'PASSWORD': config('FSTR_PASS', default=''),
         'HOST': config('FSTR_DB_HOST', default='localhost'),
         'PORT': config('FSTR_DB_PORT', default='5432'),
+        # Проверка соединения перед повторным использованием (и в пуле)
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+    }
+}
+
+# Соединения с БД: по умолчанию постоянные (переживают запрос до DB_CONN_MAX_AGE сек),
+# с DB_POOL=True - пул psycopg (нужен пакет psycopg[pool]) на процесс
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+if DB_POOL:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            # Сколько секунд запрос ждёт свободное соединение
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+            # Соединения старше max_lifetime пересоздаются, простаивающие дольше max_idle закрываются
+            'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=1800, cast=float),
+            'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+        },
+    }
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=60, cast=int)
+
+# Реплики только для чтения: DB_REPLICA_HOSTS=host1:5432,host2:5432 с теми же
+# именем БД и учётными данными. Безопасные GET перевалов читают с реплик
+PASS_READ_REPLICAS = []
+for number, replica_host in enumerate(config('DB_REPLICA_HOSTS', default='', cast=Csv()), start=1):
+    host, _, port = replica_host.partition(':')
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        # Недоступная реплика не должна задерживать проверку отставания и чтение
+        'OPTIONS': {
+            **DATABASES['default'].get('OPTIONS', {}),
+            'connect_timeout': config('DB_REPLICA_CONNECT_TIMEOUT', default=2, cast=int),
+        },
+        'TEST': {'MIRROR': 'default'},
+    }
+    PASS_READ_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['passes.replicas.ReplicaRouter']
+# Реплика, отстающая больше чем на PASS_REPLICA_MAX_LAG сек, исключается из чтения
+PASS_REPLICA_MAX_LAG = config('PASS_REPLICA_MAX_LAG', default=5.0, cast=float)
+PASS_REPLICA_LAG_CHECK_INTERVAL = config('PASS_REPLICA_LAG_CHECK_INTERVAL', default=5.0, cast=float)
+# После записи клиент столько секунд читает с primary (cookie), чтобы видеть свои изменения
+PASS_REPLICA_STICKY_SECONDS = config('PASS_REPLICA_STICKY_SECONDS', default=10, cast=int)
+PASS_REPLICA_STICKY_COOKIE = 'passes_primary'
+
+# Общий кэш между процессами (лимиты запросов). Без REDIS_URL - память процесса
+REDIS_URL = config('REDIS_URL', default='')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+if REDIS_URL:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    }
 
 
 
@@ -125,6 +187,107 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+    # Изображения перевалов хранятся по SHA-256 содержимого без дубликатов
+    'pass_images': {
+        'BACKEND': 'passes.storage.ContentAddressedStorage',
+        'OPTIONS': {
+            'prefix': 'pass_images',
+        },
+    },
+}
+
+# PASS_IMAGE_STORAGE=s3 - изображения в S3-совместимом хранилище (S3, MinIO)
+# с прямой загрузкой по подписанным URL
+if config('PASS_IMAGE_STORAGE', default='local') == 's3':
+    STORAGES['pass_images'] = {
+        'BACKEND': 'passes.storage.ObjectStoreStorage',
+        'OPTIONS': {
+            'endpoint_url': config('PASS_S3_ENDPOINT_URL', default='http://localhost:9000'),
+            'bucket': config('PASS_S3_BUCKET', default='pass-images'),
+            'access_key': config('PASS_S3_ACCESS_KEY', default=''),
+            'secret_key': config('PASS_S3_SECRET_KEY', default=''),
+            'region': config('PASS_S3_REGION', default='us-east-1'),
+            'public_url': config('PASS_S3_PUBLIC_URL', default=None),
+        },
+    }
+
+PASS_UPLOAD_PREFIX = 'pass_images/uploads'
+PASS_UPLOAD_SLOT_TTL = config('PASS_UPLOAD_SLOT_TTL', default=900, cast=int)
+PASS_UPLOAD_MAX_SIZE = config('PASS_UPLOAD_MAX_SIZE', default=10 * 1024 * 1024, cast=int)
+PASS_UPLOAD_MAX_SLOTS = config('PASS_UPLOAD_MAX_SLOTS', default=10, cast=int)
+# Через сколько часов без новых частей возобновляемая загрузка считается брошенной
+PASS_UPLOAD_SESSION_TTL_HOURS = config('PASS_UPLOAD_SESSION_TTL_HOURS', default=48, cast=int)
+
+# Сколько часов файл без ссылок хранится до удаления collect_image_blobs
+PASS_IMAGE_BLOB_GRACE_HOURS = config('PASS_IMAGE_BLOB_GRACE_HOURS', default=24, cast=int)
+
+# Фоновая очередь задач (manage.py run_pass_worker)
+PASS_JOBS_MAX_ATTEMPTS = config('PASS_JOBS_MAX_ATTEMPTS', default=5, cast=int)
+PASS_JOBS_RETRY_BASE = config('PASS_JOBS_RETRY_BASE', default=10, cast=int)
+PASS_JOBS_RETRY_MAX = config('PASS_JOBS_RETRY_MAX', default=3600, cast=int)
+# Задача в работе дольше этого срока (сек) считается брошенной упавшим обработчиком
+PASS_JOBS_STALE_TIMEOUT = config('PASS_JOBS_STALE_TIMEOUT', default=600, cast=int)
+# Как часто (сек) обработчик ищет брошенные задачи
+PASS_JOBS_REQUEUE_INTERVAL = config('PASS_JOBS_REQUEUE_INTERVAL', default=60, cast=int)
+
+# Хэши изображений (SHA-256, pHash, dHash) считаются фоновой задачей
+PASS_IMAGE_HASHING = config('PASS_IMAGE_HASHING', default=True, cast=bool)
+
+# Почта
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=10, cast=int)
+
+# Уведомления о смене статуса перевала
+PASS_NOTIFY_STATUSES = config('PASS_NOTIFY_STATUSES', default='accepted,rejected', cast=Csv())
+PASS_NOTIFICATION_FROM_EMAIL = config('PASS_NOTIFICATION_FROM_EMAIL', default='noreply@pereval.online')
+# Смены статуса за это время (сек) уходят одним письмом на туриста
+PASS_NOTIFICATION_COALESCE_SECONDS = config('PASS_NOTIFICATION_COALESCE_SECONDS', default=60, cast=int)
+PASS_NOTIFICATION_BATCH_SIZE = config('PASS_NOTIFICATION_BATCH_SIZE', default=200, cast=int)
+PASS_NOTIFICATION_MAX_ATTEMPTS = config('PASS_NOTIFICATION_MAX_ATTEMPTS', default=8, cast=int)
+# Сколько секунд забранные рассылкой уведомления скрыты от других рассыльщиков
+PASS_NOTIFICATION_CLAIM_TIMEOUT = config('PASS_NOTIFICATION_CLAIM_TIMEOUT', default=600, cast=int)
+PASS_NOTIFICATION_WEBHOOK_URLS = config('PASS_NOTIFICATION_WEBHOOK_URLS', default='', cast=Csv())
+PASS_NOTIFICATION_WEBHOOK_SECRET = config('PASS_NOTIFICATION_WEBHOOK_SECRET', default='')
+PASS_NOTIFICATION_WEBHOOK_TIMEOUT = config('PASS_NOTIFICATION_WEBHOOK_TIMEOUT', default=10, cast=int)
+
+
+# Принятые и отклонённые перевалы старше этого срока (дней) переносятся
+# в архивные таблицы командой archive_passes
+PASS_ARCHIVE_AFTER_DAYS = config('PASS_ARCHIVE_AFTER_DAYS', default=365, cast=int)
+PASS_ARCHIVE_BATCH_SIZE = config('PASS_ARCHIVE_BATCH_SIZE', default=500, cast=int)
+
+# Админка: выборки больше этого числа строк не пересчитываются COUNT(*) целиком
+PASS_ADMIN_COUNT_LIMIT = config('PASS_ADMIN_COUNT_LIMIT', default=10000, cast=int)
+
+# Кэш полного ответа о перевале (сек, 0 - выключен); сбрасывается при изменениях.
+# Работает только в общем кэше (Redis), с LocMemCache выключен
+PASS_DETAIL_CACHE_ALIAS = config('PASS_DETAIL_CACHE_ALIAS', default='default')
+PASS_DETAIL_CACHE_TIMEOUT = config('PASS_DETAIL_CACHE_TIMEOUT', default=300, cast=int)
+# Сколько id можно запросить одним GET/POST /api/submitData/batch/
+PASS_BATCH_MAX_IDS = config('PASS_BATCH_MAX_IDS', default=100, cast=int)
+
+# Ширина диапазона высот (м) в статистике GET /api/stats/
+PASS_STATS_HEIGHT_STEP = config('PASS_STATS_HEIGHT_STEP', default=500, cast=int)
+
+# Поток изменений статуса (GET /api/submitData/events/, только под ASGI)
+PASS_EVENTS_POLL_INTERVAL = config('PASS_EVENTS_POLL_INTERVAL', default=2.0, cast=float)
+PASS_EVENTS_HEARTBEAT = config('PASS_EVENTS_HEARTBEAT', default=25, cast=int)
+PASS_EVENTS_RETRY_MS = config('PASS_EVENTS_RETRY_MS', default=5000, cast=int)
+PASS_EVENTS_QUEUE_SIZE = config('PASS_EVENTS_QUEUE_SIZE', default=100, cast=int)
+PASS_EVENTS_MAX_IDS = config('PASS_EVENTS_MAX_IDS', default=100, cast=int)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -143,34 +306,101 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'passes.throttling.IPThrottle',
+        'passes.throttling.SubmitterThrottle',
+        'passes.throttling.EndpointThrottle',
+    ],
+    # Число доверенных прокси перед приложением: IP клиента для лимитов берётся
+    # из X-Forwarded-For только за ними; 0 - всегда REMOTE_ADDR
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DATETIME_FORMAT': '%Y-%m-%d %H:%M:%S',
 }
 
+# Документация API: схема OpenAPI пишется в PASS_SCHEMA_DIR один раз на версию кода,
+# интерфейсы Swagger/ReDoc загружают её по ссылке. С PASS_API_DOCS=False маршруты
+# документации не регистрируются и drf_yasg не импортируется вовсе
+PASS_API_DOCS = config('PASS_API_DOCS', default=True, cast=bool)
+if PASS_API_DOCS:
+    INSTALLED_APPS.append('drf_yasg')
+PASS_SCHEMA_DIR = config('PASS_SCHEMA_DIR', default=str(BASE_DIR / 'schema'))
+PASS_SCHEMA_MAX_AGE = config('PASS_SCHEMA_MAX_AGE', default=86400, cast=int)
+SWAGGER_SETTINGS = {'SPEC_URL': ('schema-json', {'format': '.json'})}
+REDOC_SETTINGS = {'SPEC_URL': ('schema-json', {'format': '.json'})}
+
+# Лимиты запросов (token bucket): "<число>/<s|min|hour|day>[:<ёмкость ведра>]"
+PASS_THROTTLE_ENABLED = config('PASS_THROTTLE_ENABLED', default=True, cast=bool)
+# Алиас общего кэша для вёдер; локальный кэш означает вёдра в памяти процесса
+PASS_THROTTLE_CACHE = config('PASS_THROTTLE_CACHE', default='default')
+PASS_THROTTLE_RATES = {
+    'ip': config('PASS_THROTTLE_IP_RATE', default='600/min:200'),
+    'submitter': config('PASS_THROTTLE_SUBMITTER_RATE', default='60/hour:20'),
+}
+PASS_THROTTLE_ENDPOINT_RATES = {
+    'mountainpass.create': config('PASS_THROTTLE_CREATE_RATE', default='1200/min'),
+    'upload-slots': config('PASS_THROTTLE_UPLOAD_SLOTS_RATE', default='1200/min'),
+    'upload.partial_update': config('PASS_THROTTLE_UPLOAD_CHUNK_RATE', default='6000/min'),
+}
+
+# Требовать If-Match с версией (ETag) при редактировании и смене статуса
+PASSES_REQUIRE_IF_MATCH = config('PASSES_REQUIRE_IF_MATCH', default=False, cast=bool)
+
 # Logging
+# Запросы только кладут записи в очередь; в файл (JSON, ротация по времени
+# и размеру) и консоль пишет фоновый поток. INFO можно прореживать.
+PASS_LOG_QUEUE_SIZE = config('PASS_LOG_QUEUE_SIZE', default=10000, cast=int)
+PASS_LOG_INFO_SAMPLE_RATE = config('PASS_LOG_INFO_SAMPLE_RATE', default=1.0, cast=float)
+PASS_LOG_MAX_BYTES = config('PASS_LOG_MAX_BYTES', default=50 * 1024 * 1024, cast=int)
+PASS_LOG_ROTATE_WHEN = config('PASS_LOG_ROTATE_WHEN', default='midnight')
+PASS_LOG_BACKUP_COUNT = config('PASS_LOG_BACKUP_COUNT', default=14, cast=int)
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'passes.log.JsonFormatter',
+        },
+    },
+    'filters': {
+        'info_sampling': {
+            '()': 'passes.log.SamplingFilter',
+            'rate': PASS_LOG_INFO_SAMPLE_RATE,
+        },
+    },
     'handlers': {
         'file': {
             'level': 'INFO',
-            'class': 'logging.FileHandler',
+            '()': 'passes.log.SizedTimedRotatingFileHandler',
             'filename': BASE_DIR / 'logs' / 'debug.log',
+            'max_bytes': PASS_LOG_MAX_BYTES,
+            'when': PASS_LOG_ROTATE_WHEN,
+            'backupCount': PASS_LOG_BACKUP_COUNT,
+            'encoding': 'utf-8',
+            'formatter': 'json',
         },
         'console': {
             'level': 'INFO',
             'class': 'logging.StreamHandler',
         },
+        # Имя должно идти по алфавиту после обработчиков, на которые ссылается
+        'queue': {
+            '()': 'passes.log.QueueListenerHandler',
+            'handlers': ['console', 'file'],
+            'queue_size': PASS_LOG_QUEUE_SIZE,
+            'filters': ['info_sampling'],
+        },
     },
     'loggers': {
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': True,
         },
         'passes': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
@@ -191,4 +421,12 @@ CORS_ALLOW_HEADERS = [
     'content-type',
     'authorization',
     'x-requested-with',
+    'if-match',
+    'if-none-match',
+    'upload-offset',
+]
+CORS_EXPOSE_HEADERS = [
+    'etag',
+    'upload-offset',
+    'upload-length',
 ]
\ No newline at end of file
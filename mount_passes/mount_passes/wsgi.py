@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mount_passes.settings')
 
 application = get_wsgi_application()
+
+# Прогрев до приёма запросов (PASS_WARM_UP): первый запрос не платит за разбор URLconf и сериализаторов
+from passes.startup import maybe_warm_up  # noqa: E402
+
+maybe_warm_up()
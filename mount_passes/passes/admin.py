@@ -1,5 +1,12 @@
 from django.contrib import admin
-from .models import User, Coords, Level, MountainPass, PassImage
+from django.db.models import Prefetch
+from .models import (
+    User, Coords, Level, MountainPass, PassImage, Job, NotificationOutbox, PassStatusHistory,
+    ArchivedPass, ArchivedPassImage,
+)
+from .moderation import change_status
+from .pagination import EstimatedCountPaginator
+from .signals import StatusChange, pass_status_changed
 
 
 @admin.register(User)
@@ -25,11 +32,139 @@ class PassImageAdmin(admin.ModelAdmin):
 
 @admin.register(MountainPass)
 class MountainPassAdmin(admin.ModelAdmin):
-    list_display = ('title', 'beauty_title', 'user', 'status', 'add_time')
+    list_display = ('title', 'beauty_title', 'user', 'status', 'add_time', 'images_list')
     list_filter = ('status', 'add_time')
-    search_fields = ('title', 'beauty_title', 'user__email')
+    # Поиск только по индексам: id, точный email, начало названия (с учётом регистра)
+    search_fields = ('=id', 'user__email', 'title')
+    search_help_text = "id перевала, email пользователя или начало названия"
     readonly_fields = ('add_time',)
+    actions = ['mark_pending', 'mark_accepted', 'mark_rejected']
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
+    raw_id_fields = ('coords', 'level')
+    paginator = EstimatedCountPaginator
+    # Без второго COUNT(*) по всей таблице при фильтрах
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related(
+            Prefetch('images', queryset=PassImage.objects.order_by('mountain_pass_id', 'created_at').only(
+                'mountain_pass', 'title', 'created_at'
+            ))
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if term.isdigit():
+            return queryset.filter(pk=int(term)), False
+        if '@' in term:
+            return queryset.filter(user__email__in={term, term.lower()}), False
+        # LIKE 'term%' по индексу passes_title_idx (varchar_pattern_ops) вместо LIKE '%...%'
+        return queryset.filter(title__startswith=term), False
 
     def images_list(self, obj):
         return ", ".join([img.title for img in obj.images.all()])
     images_list.short_description = "Изображения"
+
+    def save_model(self, request, obj, form, change):
+        old_status = obj.loaded_value('status') if change else None
+        super().save_model(request, obj, form, change)
+        if change and old_status != obj.status:
+            pass_status_changed.send(
+                sender=MountainPass,
+                changes=[StatusChange(obj.pk, obj.user_id, old_status, obj.status)],
+                actor=request.user.get_username()
+            )
+
+    def _change_status(self, request, queryset, new_status):
+        changed = change_status(queryset, new_status, actor=request.user.get_username())
+        self.message_user(request, f"Статус изменён у перевалов: {changed}")
+
+    @admin.action(description="Отправить на модерацию")
+    def mark_pending(self, request, queryset):
+        self._change_status(request, queryset, 'pending')
+
+    @admin.action(description="Принять")
+    def mark_accepted(self, request, queryset):
+        self._change_status(request, queryset, 'accepted')
+
+    @admin.action(description="Отклонить")
+    def mark_rejected(self, request, queryset):
+        self._change_status(request, queryset, 'rejected')
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('task', 'queue', 'status', 'priority', 'attempts', 'run_at')
+    list_filter = ('status', 'queue', 'task')
+    readonly_fields = ('created_at', 'locked_at', 'locked_by', 'last_error')
+    actions = ['retry_jobs']
+
+    @admin.action(description="Повторить выбранные задачи")
+    def retry_jobs(self, request, queryset):
+        from django.utils import timezone
+
+        updated = queryset.exclude(status='running').update(
+            status='queued', attempts=0, run_at=timezone.now()
+        )
+        self.message_user(request, f"Возвращено в очередь: {updated}")
+
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ('event', 'channel', 'user', 'mountain_pass', 'status', 'attempts', 'created_at')
+    list_filter = ('status', 'channel', 'event')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+    actions = ['resend_notifications']
+
+    @admin.action(description="Отправить повторно")
+    def resend_notifications(self, request, queryset):
+        from django.utils import timezone
+        from .notifications import schedule_dispatch
+
+        updated = queryset.exclude(status='pending').update(
+            status='pending', attempts=0, next_attempt_at=timezone.now()
+        )
+        schedule_dispatch(0)
+        self.message_user(request, f"Поставлено на отправку: {updated}")
+
+
+@admin.register(PassStatusHistory)
+class PassStatusHistoryAdmin(admin.ModelAdmin):
+    list_display = ('mountain_pass', 'from_status', 'to_status', 'actor', 'changed_at')
+    list_filter = ('to_status', 'changed_at')
+    search_fields = ('=mountain_pass__id', 'actor')
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class ArchivedPassImageInline(admin.TabularInline):
+    model = ArchivedPassImage
+    fields = ('title', 'image', 'created_at')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+
+@admin.register(ArchivedPass)
+class ArchivedPassAdmin(admin.ModelAdmin):
+    """Архив только для просмотра: записи создаёт команда archive_passes"""
+    list_display = ('title', 'user', 'status', 'add_time', 'archived_at')
+    list_filter = ('status',)
+    search_fields = ('=id', 'title', '=user__email')
+    inlines = [ArchivedPassImageInline]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class PassesConfig(AppConfig):
     name = 'passes'
+
+    def ready(self):
+        from . import dbpool, signals, tasks  # noqa: F401
@@ -0,0 +1,118 @@
+"""Архив завершённых перевалов: перенос пачками и чтение без различия с рабочей таблицей"""
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import BooleanField, Value
+from django.utils import timezone
+
+from . import detail_cache
+from .models import ArchivedPass, ArchivedPassImage, Coords, Level, MountainPass, PassImage
+
+FINAL_STATUSES = ('accepted', 'rejected')
+
+# Истина, пока перевалы удаляются из рабочей таблицы при архивации:
+# обработчики удаления не должны уменьшать статистику и освобождать файлы
+archiving = ContextVar('passes_archiving', default=False)
+
+PASS_FIELDS = ('id', 'beauty_title', 'title', 'other_titles', 'connect', 'user_id',
+               'add_time', 'update_time', 'status', 'version')
+COORDS_FIELDS = ('latitude', 'longitude', 'height')
+LEVEL_FIELDS = ('winter', 'summer', 'autumn', 'spring')
+IMAGE_FIELDS = ('id', 'mountain_pass_id', 'title', 'image', 'sha256', 'phash', 'dhash', 'created_at')
+
+
+def archivable(older_than_days):
+    """Завершённые перевалы старше порога без неотправленных уведомлений"""
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    return MountainPass.objects.filter(
+        status__in=FINAL_STATUSES, add_time__lt=cutoff
+    ).exclude(notifications__status='pending')
+
+
+def archive_batch(older_than_days, batch_size):
+    """
+    Переносит в архив до batch_size перевалов одной транзакцией и возвращает
+    их число. Прерванная пачка откатывается целиком, поэтому повторный запуск
+    просто продолжает с оставшихся перевалов.
+    """
+    with transaction.atomic():
+        candidates = archivable(older_than_days).order_by('pk')
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True, of=('self',))
+        ids = list(candidates.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return 0
+
+        passes = list(MountainPass.objects.filter(pk__in=ids).select_related('coords', 'level'))
+        ArchivedPass.objects.bulk_create([
+            ArchivedPass(
+                **{field: getattr(mp, field) for field in PASS_FIELDS},
+                **{field: getattr(mp.coords, field) for field in COORDS_FIELDS},
+                **{field: getattr(mp.level, field) for field in LEVEL_FIELDS},
+            )
+            for mp in passes
+        ])
+        ArchivedPassImage.objects.bulk_create([
+            ArchivedPassImage(**{field: getattr(image, field) for field in IMAGE_FIELDS})
+            for image in PassImage.objects.filter(mountain_pass_id__in=ids)
+        ])
+
+        token = archiving.set(True)
+        try:
+            MountainPass.objects.filter(pk__in=ids).delete()
+            Coords.objects.filter(pk__in=[mp.coords_id for mp in passes]).delete()
+            Level.objects.filter(pk__in=[mp.level_id for mp in passes]).delete()
+        finally:
+            archiving.reset(token)
+        detail_cache.invalidate(ids)
+    return len(ids)
+
+
+def get_archived(pk):
+    """Архивный перевал со всем нужным для сериализации или None"""
+    try:
+        pk = int(pk)
+    except (TypeError, ValueError):
+        return None
+    return archived_passes([pk]).first()
+
+
+def archived_passes(ids):
+    """Архивные перевалы с тем, что нужно для полного ответа"""
+    return ArchivedPass.objects.select_related('user').prefetch_related('images').filter(pk__in=ids)
+
+
+def pass_exists(pk):
+    return MountainPass.objects.filter(pk=pk).exists() or ArchivedPass.objects.filter(pk=pk).exists()
+
+
+class UserPassList:
+    """
+    Перевалы пользователя из рабочей таблицы и архива одним списком по
+    убыванию add_time. Срез выбирает id страницы одним UNION-запросом
+    и загружает только их, поэтому подходит для Paginator. Фильтры
+    представления применяются к обеим частям до передачи сюда.
+    """
+
+    def __init__(self, queryset, archived_queryset):
+        self.queryset = queryset
+        self.archived_queryset = archived_queryset
+
+    def _keys(self, queryset):
+        return queryset.order_by().annotate(
+            archived=Value(queryset.model is ArchivedPass, output_field=BooleanField())
+        ).values_list('add_time', 'id', 'archived')
+
+    def __getitem__(self, item):
+        keys = self._keys(self.queryset).union(
+            self._keys(self.archived_queryset)
+        ).order_by('-add_time', '-id')[item]
+        keys = list(keys)
+        # Порядок задают ключи, сортировка по id страницы не нужна
+        hot = self.queryset.order_by().in_bulk([pk for _, pk, archived in keys if not archived])
+        archived = self.archived_queryset.order_by().in_bulk([pk for _, pk, archived in keys if archived])
+        return [(archived if is_archived else hot)[pk] for _, pk, is_archived in keys]
+
+    def __len__(self):
+        return self.queryset.count() + self.archived_queryset.count()
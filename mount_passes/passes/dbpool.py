@@ -0,0 +1,80 @@
+"""Статистика соединений с БД: пул psycopg или постоянные соединения"""
+import threading
+import time
+
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+class ConnectionCounters:
+    """Счётчики процесса: сколько соединений открыто и сколько запросов обслужено"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.opened = 0
+        self.requests = 0
+        self.opened_at = {}
+
+    def connection_opened(self, alias):
+        with self.lock:
+            self.opened += 1
+            self.opened_at[alias] = time.monotonic()
+
+    def request_started(self):
+        with self.lock:
+            self.requests += 1
+
+
+counters = ConnectionCounters()
+
+
+def _connection_created(sender, connection, **kwargs):
+    counters.connection_opened(connection.alias)
+
+
+def _request_started(sender, **kwargs):
+    counters.request_started()
+
+
+connection_created.connect(_connection_created, dispatch_uid='passes_count_connections')
+request_started.connect(_request_started, dispatch_uid='passes_count_requests')
+
+
+def pool_stats(alias='default'):
+    """
+    Состояние соединений: для пула - занятые, свободные, ожидающие и среднее
+    ожидание; для постоянных соединений - сколько открыто и доля переиспользования
+    """
+    connection = connections[alias]
+    settings_dict = connection.settings_dict
+    pool = getattr(connection, 'pool', None)
+    if pool is not None:
+        stats = pool.get_stats()
+        size, available = stats.get('pool_size', 0), stats.get('pool_available', 0)
+        served = stats.get('requests_num', 0)
+        return {
+            'mode': 'pool',
+            'min_size': stats.get('pool_min'),
+            'max_size': stats.get('pool_max'),
+            'size': size,
+            'in_use': size - available,
+            'idle': available,
+            'waiting': stats.get('requests_waiting', 0),
+            'requests': served,
+            'wait_ms_avg': round(stats.get('requests_wait_ms', 0) / served, 3) if served else 0,
+            'errors': stats.get('requests_errors', 0) + stats.get('connections_errors', 0),
+            'health_checks': settings_dict['CONN_HEALTH_CHECKS'],
+        }
+
+    opened_at = counters.opened_at.get(alias)
+    return {
+        'mode': 'persistent' if settings_dict['CONN_MAX_AGE'] else 'per_request',
+        'max_age': settings_dict['CONN_MAX_AGE'],
+        'health_checks': settings_dict['CONN_HEALTH_CHECKS'],
+        'opened': counters.opened,
+        'requests': counters.requests,
+        'requests_per_connection': round(counters.requests / counters.opened, 2) if counters.opened else 0,
+        'connection_age': round(time.monotonic() - opened_at, 1)
+        if opened_at is not None and connection.connection is not None else None,
+    }
@@ -0,0 +1,111 @@
+"""
+Кэш полного ответа GET /submitData/<id>/ (и пакетного /submitData/batch/).
+Хранятся данные сериализатора с относительными ссылками на изображения
+(как в ответе без кэша) и ETag; записи сбрасываются сигналами при любом
+изменении перевала.
+
+Каждому перевалу соответствует счётчик поколения. Читатель запоминает
+поколение до запроса к БД и сохраняет его в записи; invalidate увеличивает
+счётчик, поэтому запись, сохранённая медленным читателем после сброса,
+не совпадёт с текущим поколением и не будет отдана.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .replicas import read_alias
+from .throttling import is_shared_cache
+
+KEY_PREFIX = 'passes:detail:'
+GENERATION_PREFIX = 'passes:detail-generation:'
+
+
+def _cache():
+    return caches[settings.PASS_DETAIL_CACHE_ALIAS]
+
+
+def enabled():
+    """
+    Только в общем кэше: сброс из одного процесса не доходит до памяти
+    других, и они отдавали бы старые данные и ETag до истечения срока
+    """
+    return settings.PASS_DETAIL_CACHE_TIMEOUT > 0 and is_shared_cache(settings.PASS_DETAIL_CACHE_ALIAS)
+
+
+def cache_key(pk):
+    return f"{KEY_PREFIX}{pk}"
+
+
+def generation_key(pk):
+    return f"{GENERATION_PREFIX}{pk}"
+
+
+def lookup(ids):
+    """
+    ({id: {'etag', 'data'}} для найденных в кэше перевалов, {id: поколение}
+    для остальных). Поколения нужно передать в store после чтения из БД.
+    """
+    if not enabled() or not ids:
+        return {}, {}
+    cache = _cache()
+    found = cache.get_many([cache_key(pk) for pk in ids] + [generation_key(pk) for pk in ids])
+    entries, generations = {}, {}
+    for pk in ids:
+        generation = found.get(generation_key(pk))
+        entry = found.get(cache_key(pk))
+        if generation is not None and entry is not None and entry['generation'] == generation:
+            entries[pk] = {'etag': entry['etag'], 'data': entry['data']}
+            continue
+        if generation is None:
+            # Счётчик начинается с текущего времени: после вытеснения новый
+            # счётчик не совпадёт с поколением старых записей
+            cache.add(generation_key(pk), time.time_ns(), None)
+            generation = cache.get(generation_key(pk))
+        generations[pk] = generation
+    return entries, generations
+
+
+def store(instances, generations):
+    """
+    Сериализует перевалы (рабочие или архивные) и кладёт в кэш с поколением,
+    прочитанным в lookup до запроса к БД. Прочитанное с реплики не кэшируется:
+    оно может отставать от только что сброшенной записи.
+    """
+    from .serializers import MountainPassDetailSerializer
+
+    entries = {
+        instance.pk: {'etag': instance.etag, 'data': dict(MountainPassDetailSerializer(instance).data)}
+        for instance in instances
+    }
+    if entries and enabled() and read_alias.get() is None:
+        _cache().set_many(
+            {
+                cache_key(pk): {**entry, 'generation': generations[pk]}
+                for pk, entry in entries.items() if generations.get(pk) is not None
+            },
+            settings.PASS_DETAIL_CACHE_TIMEOUT,
+        )
+    return entries
+
+
+def _bump(ids):
+    cache = _cache()
+    cache.delete_many([cache_key(pk) for pk in ids])
+    for pk in ids:
+        try:
+            cache.incr(generation_key(pk))
+        except ValueError:
+            # Счётчика нет: следующий читатель начнёт новое поколение
+            pass
+
+
+def invalidate(ids):
+    ids = list(ids)
+    if not ids or not enabled():
+        return
+    _bump(ids)
+    # Повтор после коммита: параллельный запрос мог прочитать старую версию
+    # из БД уже после первого увеличения поколения
+    transaction.on_commit(lambda: _bump(ids))
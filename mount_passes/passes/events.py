@@ -0,0 +1,180 @@
+"""Поток изменений статуса перевалов для Server-Sent Events"""
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import MountainPass
+
+logger = logging.getLogger(__name__)
+
+EVENT_FIELDS = ('id', 'user_id', 'status', 'version', 'update_time')
+# Курсор пустой таблицы: все будущие записи новее
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def format_event(row):
+    """Сообщение SSE об изменении перевала"""
+    data = {
+        'id': row['id'],
+        'status': row['status'],
+        'version': row['version'],
+        # В часовом поясе API, как update_time в ответах DRF
+        'update_time': timezone.localtime(row['update_time']).strftime(settings.REST_FRAMEWORK['DATETIME_FORMAT']),
+    }
+    return f"id: {row['id']}-{row['version']}\nevent: status\ndata: {json.dumps(data)}\n\n"
+
+
+class Subscription:
+    """Очередь событий одного клиента по его перевалам или пользователю"""
+
+    def __init__(self, pass_ids=(), user_id=None):
+        self.pass_ids = set(pass_ids)
+        self.user_id = user_id
+        self.queue = asyncio.Queue(maxsize=settings.PASS_EVENTS_QUEUE_SIZE)
+
+    def push(self, row):
+        try:
+            self.queue.put_nowait(row)
+        except asyncio.QueueFull:
+            # Медленный клиент: событие теряется, при переподключении
+            # клиент получит актуальное состояние перевалов
+            pass
+
+
+class StatusBroker:
+    """
+    Pub/sub изменений внутри процесса. Один опрос БД на процесс по курсору
+    update_time раздаёт изменения всем подпискам, поэтому число открытых
+    соединений не влияет на нагрузку на базу.
+    """
+
+    def __init__(self):
+        self.by_pass = {}
+        self.by_user = {}
+        self.cursor = None
+        self._boundary = set()
+        self._task = None
+        self._cursor_lock = None
+
+    def subscribe(self, subscription):
+        for pass_id in subscription.pass_ids:
+            self.by_pass.setdefault(pass_id, set()).add(subscription)
+        if subscription.user_id is not None:
+            self.by_user.setdefault(subscription.user_id, set()).add(subscription)
+        loop = asyncio.get_running_loop()
+        if self._task is not None and self._task.get_loop() is not loop:
+            # Опрос остался в завершённом цикле событий: его курсор устарел
+            self._task = None
+            self.cursor = None
+            self._boundary = set()
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    def unsubscribe(self, subscription):
+        for index, key in [(self.by_pass, pass_id) for pass_id in subscription.pass_ids] + \
+                [(self.by_user, subscription.user_id)]:
+            subscribers = index.get(key)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del index[key]
+
+    def has_subscribers(self):
+        return bool(self.by_pass or self.by_user)
+
+    def _lock(self):
+        # asyncio.Lock привязывается к циклу событий, в котором его впервые ждали
+        loop = asyncio.get_running_loop()
+        if self._cursor_lock is None or self._cursor_lock[0] is not loop:
+            self._cursor_lock = (loop, asyncio.Lock())
+        return self._cursor_lock[1]
+
+    async def ensure_cursor(self):
+        """
+        Начинает курсор, если опрос ещё не идёт. Новый подписчик вызывает его
+        до снимка состояния, поэтому изменения между снимком и первым
+        опросом не теряются
+        """
+        async with self._lock():
+            if self.cursor is None:
+                result = await MountainPass.objects.aaggregate(cursor=Max('update_time'))
+                self.cursor = result['cursor'] or EPOCH
+
+    async def poll(self):
+        """Один проход курсора: раздаёт изменения подписчикам, возвращает их число"""
+        await self.ensure_cursor()
+
+        # Записи с одинаковым update_time могут прийти после прошлого опроса,
+        # поэтому граница берётся включительно, а уже отданные строки пропускаются
+        queryset = (
+            MountainPass.objects.filter(update_time__gte=self.cursor)
+            .order_by('update_time')
+            .values(*EVENT_FIELDS)
+        )
+        rows = [row async for row in queryset]
+        fresh = [row for row in rows if (row['id'], row['version']) not in self._boundary]
+        if rows:
+            if rows[-1]['update_time'] != self.cursor:
+                self._boundary = set()
+            self.cursor = rows[-1]['update_time']
+            self._boundary |= {
+                (row['id'], row['version']) for row in rows if row['update_time'] == self.cursor
+            }
+
+        for row in fresh:
+            targets = self.by_pass.get(row['id'], set()) | self.by_user.get(row['user_id'], set())
+            for subscription in targets:
+                subscription.push(row)
+        return len(fresh)
+
+    async def _run(self):
+        while self.has_subscribers():
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error("Ошибка опроса изменений перевалов: %s", e)
+            await asyncio.sleep(settings.PASS_EVENTS_POLL_INTERVAL)
+        # Без подписчиков курсор не нужен: новые клиенты получат снимок состояния
+        if self._task is asyncio.current_task():
+            self._task = None
+            self.cursor = None
+            self._boundary = set()
+
+
+broker = StatusBroker()
+
+
+async def stream_events(subscription, snapshot_queryset):
+    """
+    Генератор тела ответа: текущее состояние, затем изменения
+    и комментарии-пинги, чтобы прокси не закрывали соединение.
+    Подписка и курсор появляются до снимка; изменения, уже вошедшие
+    в снимок, повторно не отправляются.
+    """
+    broker.subscribe(subscription)
+    try:
+        await broker.ensure_cursor()
+        snapshot = [row async for row in snapshot_queryset.order_by('pk').values(*EVENT_FIELDS)]
+        sent = {row['id']: row['version'] for row in snapshot}
+        yield f"retry: {settings.PASS_EVENTS_RETRY_MS}\n\n"
+        for row in snapshot:
+            yield format_event(row)
+        while True:
+            try:
+                row = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=settings.PASS_EVENTS_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if row['version'] <= sent.get(row['id'], 0):
+                continue
+            sent[row['id']] = row['version']
+            yield format_event(row)
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,30 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PreconditionFailed(APIException):
+    """Версия из If-Match не совпадает с текущей"""
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'Запись изменилась: версия в If-Match устарела'
+    default_code = 'precondition_failed'
+
+
+class PreconditionRequired(APIException):
+    """Изменение без If-Match запрещено настройкой PASSES_REQUIRE_IF_MATCH"""
+    status_code = status.HTTP_428_PRECONDITION_REQUIRED
+    default_detail = 'Нужен заголовок If-Match с версией записи'
+    default_code = 'precondition_required'
+
+
+class EditConflict(APIException):
+    """Запись изменили параллельно между чтением и записью"""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Запись была изменена параллельно, повторите запрос'
+    default_code = 'conflict'
+
+
+class UnknownFields(APIException):
+    """В ?fields= или ?expand= указаны поля, которых нет в ответе"""
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = 'Неизвестные поля'
+    default_code = 'unknown_fields'
@@ -0,0 +1,76 @@
+"""
+Выборочные поля ответа: ?fields=id,title,coords и ?expand=user,images.
+Запрос к БД строится только под выбранные поля: only() для столбцов,
+select_related/prefetch_related только для запрошенных связей.
+"""
+from functools import lru_cache
+
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+from .exceptions import UnknownFields
+
+
+def _split(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def requested_fields(query_params, available, default):
+    """
+    Поля ответа в порядке объявления в сериализаторе или None, если клиент
+    ничего не выбирал. fields задаёт набор целиком, expand добавляет
+    вложенные объекты к набору по умолчанию.
+    """
+    fields = _split(query_params.get('fields', ''))
+    expand = _split(query_params.get('expand', ''))
+    if not fields and not expand:
+        return None
+    unknown = [name for name in fields + expand if name not in available]
+    if unknown:
+        raise UnknownFields(f"Неизвестные поля: {', '.join(unknown)}")
+    selected = set(fields or default) | set(expand)
+    return [name for name in available if name in selected]
+
+
+@lru_cache(maxsize=256)
+def _query_plan(serializer_class, fields):
+    """(столбцы для only, связи для select_related, {связь: столбцы} для prefetch)"""
+    model = serializer_class.Meta.model
+    declared = serializer_class().fields
+    only = {model._meta.pk.name}
+    related, prefetch = [], {}
+    for name in fields:
+        field = declared[name]
+        if isinstance(field, serializers.ListSerializer):
+            child = field.child
+            # Внешний ключ нужен, чтобы разложить prefetch по объектам
+            foreign_key = model._meta.get_field(field.source).field.attname
+            prefetch[field.source] = (foreign_key, *(child.fields[column].source for column in child.fields))
+        elif isinstance(field, serializers.BaseSerializer):
+            related.append(field.source)
+            only.add(field.source)
+            only.update(f"{field.source}__{child.source}" for child in field.fields.values())
+        else:
+            only.add(field.source)
+    return tuple(sorted(only)), tuple(related), prefetch
+
+
+def shape_queryset(queryset, serializer_class, fields, extra=(), prefetch_querysets=None):
+    """
+    Ограничивает queryset полями сериализатора fields. extra - столбцы,
+    нужные представлению помимо ответа (например, версия для ETag);
+    prefetch_querysets задаёт базовые запросы для связей (порядок сортировки).
+    """
+    only, related, prefetch = _query_plan(serializer_class, tuple(fields))
+    queryset = queryset.only(*only, *extra)
+    if related:
+        queryset = queryset.select_related(*related)
+    lookups = []
+    for relation, columns in prefetch.items():
+        base = (prefetch_querysets or {}).get(relation)
+        if base is None:
+            base = queryset.model._meta.get_field(relation).related_model.objects.all()
+        lookups.append(Prefetch(relation, queryset=base.only(*columns)))
+    if lookups:
+        queryset = queryset.prefetch_related(*lookups)
+    return queryset
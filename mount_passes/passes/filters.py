@@ -1,10 +1,82 @@
+from decimal import Decimal, InvalidOperation
+
 import django_filters
-from .models import MountainPass
+from django import forms
+from django_filters.constants import EMPTY_VALUES
+
+from .models import Level, MountainPass
+
+LEVEL_LOOKUPS = ('exact', 'lt', 'lte', 'gt', 'gte')
+# Категории вводят и кириллицей: 1А, 2Б
+CYRILLIC_LEVEL = str.maketrans({'А': 'A', 'а': 'A', 'Б': 'B', 'б': 'B'})
+
+
+class LevelField(forms.ChoiceField):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('choices', Level.LEVEL_CHOICES)
+        super().__init__(*args, **kwargs)
+
+    def to_python(self, value):
+        return super().to_python(value).translate(CYRILLIC_LEVEL).upper()
+
+
+class LevelFilter(django_filters.Filter):
+    """Категория сложности (1A..3B), сравнивается по порядковому номеру *_rank"""
+    field_class = LevelField
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        return super().filter(qs, Level.RANKS[value])
+
+
+class BBoxField(forms.CharField):
+    def clean(self, value):
+        value = super().clean(value)
+        if not value:
+            return None
+        try:
+            min_lon, min_lat, max_lon, max_lat = (Decimal(part.strip()) for part in value.split(','))
+        except (ValueError, InvalidOperation):
+            raise forms.ValidationError("Ожидается bbox=мин_долгота,мин_широта,макс_долгота,макс_широта")
+        if min_lon > max_lon or min_lat > max_lat:
+            raise forms.ValidationError("Минимум bbox больше максимума")
+        return min_lon, min_lat, max_lon, max_lat
+
+
+class BBoxFilter(django_filters.Filter):
+    """Прямоугольник на карте по копиям координат в MountainPass"""
+    field_class = BBoxField
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        min_lon, min_lat, max_lon, max_lat = value
+        return qs.filter(latitude__range=(min_lat, max_lat), longitude__range=(min_lon, max_lon))
 
 
 class MountainPassFilter(django_filters.FilterSet):
+    """
+    Фильтры списка перевалов. Сложность и высота берутся из копий
+    в MountainPass, поэтому запрос не соединяется с Level и Coords:
+    ?summer_level__lte=2A&height__range=3000,4500&status=accepted&bbox=42,43,43,44
+    """
     email = django_filters.CharFilter(field_name='user__email', lookup_expr='exact')
+    bbox = BBoxFilter()
 
     class Meta:
         model = MountainPass
-        fields = ['status', 'user__email']
\ No newline at end of file
+        fields = {
+            'status': ['exact', 'in'],
+            'user__email': ['exact'],
+            'height': ['exact', 'lt', 'lte', 'gt', 'gte', 'range'],
+        }
+
+    @classmethod
+    def get_filters(cls):
+        filters = super().get_filters()
+        for season in Level.SEASONS:
+            for lookup in LEVEL_LOOKUPS:
+                name = f"{season}_level" if lookup == 'exact' else f"{season}_level__{lookup}"
+                filters[name] = LevelFilter(field_name=f"{season}_rank", lookup_expr=lookup)
+        return filters
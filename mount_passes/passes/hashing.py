@@ -0,0 +1,211 @@
+"""Хэши изображений перевалов: точные (SHA-256) и перцептивные (pHash/dHash)"""
+import hashlib
+import logging
+import math
+import threading
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 64 * 1024
+PHASH_SIZE = 32
+PHASH_LOW_FREQ = 8
+
+
+def sha256_file(file):
+    """SHA-256 содержимого файла, читается кусками"""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def _bits_to_hex(bits):
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return f"{value:016x}"
+
+
+def dhash(image):
+    """Разностный хэш: сравнение соседних пикселей уменьшенного изображения"""
+    from PIL import Image
+
+    gray = image.convert('L').resize((9, 8), Image.LANCZOS)
+    pixels = list(gray.getdata())
+    bits = []
+    for row in range(8):
+        offset = row * 9
+        for col in range(8):
+            bits.append(pixels[offset + col] > pixels[offset + col + 1])
+    return _bits_to_hex(bits)
+
+
+def _dct_table():
+    return [
+        [math.cos(math.pi * (2 * x + 1) * u / (2 * PHASH_SIZE)) for x in range(PHASH_SIZE)]
+        for u in range(PHASH_LOW_FREQ)
+    ]
+
+
+_DCT_COS = _dct_table()
+
+
+def phash(image):
+    """Перцептивный хэш по низким частотам DCT 32x32"""
+    from PIL import Image
+
+    gray = image.convert('L').resize((PHASH_SIZE, PHASH_SIZE), Image.LANCZOS)
+    pixels = list(gray.getdata())
+    rows = [pixels[i * PHASH_SIZE:(i + 1) * PHASH_SIZE] for i in range(PHASH_SIZE)]
+
+    # DCT разделима: сначала по строкам, затем по столбцам
+    row_coeffs = [
+        [sum(c * p for c, p in zip(_DCT_COS[v], row)) for v in range(PHASH_LOW_FREQ)]
+        for row in rows
+    ]
+    coeffs = [
+        sum(_DCT_COS[u][y] * row_coeffs[y][v] for y in range(PHASH_SIZE))
+        for u in range(PHASH_LOW_FREQ)
+        for v in range(PHASH_LOW_FREQ)
+    ]
+
+    # Постоянная составляющая не участвует в медиане
+    ordered = sorted(coeffs[1:])
+    median = ordered[len(ordered) // 2]
+    return _bits_to_hex(c > median for c in coeffs)
+
+
+def hamming_distance(first, second):
+    """Расстояние Хэмминга между двумя 64-битными хэшами в hex"""
+    return bin(int(first, 16) ^ int(second, 16)).count('1')
+
+
+class BKTree:
+    """BK-дерево для поиска хэшей в пределах расстояния Хэмминга"""
+
+    def __init__(self, items=()):
+        self.root = None
+        self.size = 0
+        for key, value in items:
+            self.add(key, value)
+
+    def add(self, key, value):
+        node = (key, [value], {})
+        self.size += 1
+        if self.root is None:
+            self.root = node
+            return
+        current = self.root
+        while True:
+            distance = hamming_distance(key, current[0])
+            if distance == 0:
+                current[1].append(value)
+                return
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def search(self, key, max_distance):
+        """Список (расстояние, значение) в пределах max_distance"""
+        if self.root is None:
+            return []
+        found = []
+        candidates = [self.root]
+        while candidates:
+            node_key, values, children = candidates.pop()
+            distance = hamming_distance(key, node_key)
+            if distance <= max_distance:
+                found.extend((distance, value) for value in values)
+            low, high = distance - max_distance, distance + max_distance
+            candidates.extend(
+                child for child_distance, child in children.items()
+                if low <= child_distance <= high
+            )
+        return sorted(found, key=lambda item: item[0])
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_phash_index(rebuild=False):
+    """BK-дерево pHash всех изображений, строится один раз на процесс"""
+    global _index
+    from .models import PassImage
+
+    with _index_lock:
+        if _index is None or rebuild:
+            rows = PassImage.objects.exclude(phash='').values_list('phash', 'id')
+            _index = BKTree(rows.iterator())
+        return _index
+
+
+def _add_to_index(image):
+    with _index_lock:
+        if _index is not None and image.phash:
+            _index.add(image.phash, image.pk)
+
+
+def compute_image_hashes(image):
+    """Вычисляет хэши PassImage и переиспользует уже сохранённый файл-дубликат"""
+    from PIL import Image
+
+    from . import detail_cache
+    from .models import ImageBlob, PassImage
+    from .storage import release_blobs, retain_blobs
+
+    with image.image.open('rb') as file:
+        sha256 = sha256_file(file)
+        with Image.open(file) as picture:
+            picture.load()
+            image.phash = phash(picture)
+            image.dhash = dhash(picture)
+    image.sha256 = sha256
+    update_fields = ['sha256', 'phash', 'dhash']
+
+    original = (
+        PassImage.objects.filter(sha256=sha256)
+        .exclude(pk=image.pk)
+        .exclude(image=image.image.name)
+        .order_by('pk')
+        .first()
+    )
+    duplicate_name = None
+    if original is not None:
+        duplicate_name = image.image.name
+        image.image.name = original.image.name
+        update_fields.append('image')
+
+    PassImage.objects.filter(pk=image.pk).update(
+        **{field: getattr(image, field) for field in update_fields}
+    )
+    # Объекты, загруженные напрямую в S3, регистрируются без хэша
+    ImageBlob.objects.filter(name=duplicate_name or image.image.name, sha256='').update(sha256=sha256)
+
+    if duplicate_name is not None:
+        # Ссылка на файл в ответе перевала изменилась
+        detail_cache.invalidate([image.mountain_pass_id])
+        retain_blobs([image.image.name])
+        release_blobs([duplicate_name])
+        # Файлы вне учёта ImageBlob (старые загрузки) удаляем сразу
+        if (not ImageBlob.objects.filter(name=duplicate_name).exists()
+                and not PassImage.objects.filter(image=duplicate_name).exists()):
+            image.image.storage.delete(duplicate_name)
+        logger.info("Изображение %s совпадает с %s, файл переиспользован", image.pk, original.pk)
+    _add_to_index(image)
+    return image
+
+
+def schedule_image_hashing(image_id):
+    """Ставит вычисление хэшей в фоновую очередь, вне запроса"""
+    from .jobs import enqueue
+
+    if not getattr(settings, 'PASS_IMAGE_HASHING', True):
+        return
+    enqueue('passes.hash_image', {'image_id': image_id}, priority=-1)
@@ -0,0 +1,51 @@
+"""Журнал смен статуса: запись и запросы по истории"""
+from datetime import timedelta
+
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def record_status_changes(changes, actor=''):
+    """
+    Записывает смены статуса одним bulk_create в текущей транзакции:
+    история сохраняется и откатывается вместе со сменой статуса.
+    """
+    from .models import PassStatusHistory
+
+    changed_at = timezone.now()
+    PassStatusHistory.objects.bulk_create([
+        PassStatusHistory(
+            mountain_pass_id=change.pass_id,
+            from_status=change.old_status,
+            to_status=change.new_status,
+            actor=actor[:150],
+            changed_at=changed_at,
+        )
+        for change in changes
+    ])
+
+
+def pass_timeline(pass_id):
+    """История статусов перевала по времени"""
+    from .models import PassStatusHistory
+
+    return PassStatusHistory.objects.filter(mountain_pass_id=pass_id).order_by('changed_at', 'pk')
+
+
+def daily_moderation_rates(days):
+    """Число смен статуса по дням и итоговым статусам за последние days дней"""
+    from .models import PassStatusHistory
+
+    since = timezone.now() - timedelta(days=days)
+    rows = (
+        PassStatusHistory.objects.filter(changed_at__gte=since)
+        .annotate(day=TruncDate('changed_at'))
+        .values('day', 'to_status')
+        .annotate(count=Count('id'))
+        .order_by('day', 'to_status')
+    )
+    rates = {}
+    for row in rows:
+        rates.setdefault(row['day'].isoformat(), {})[row['to_status']] = row['count']
+    return [{'day': day, **counts} for day, counts in rates.items()]
@@ -0,0 +1,177 @@
+"""Очередь фоновых задач на таблице БД (PostgreSQL, для тестов SQLite)"""
+import logging
+import os
+import random
+import socket
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(name):
+    """Регистрирует функцию как задачу очереди под именем name"""
+    def decorator(func):
+        _registry[name] = func
+        func.task_name = name
+        return func
+    return decorator
+
+
+def enqueue(task_name, payload=None, *, queue='default', priority=0, delay=0, max_attempts=None):
+    """
+    Ставит задачу в очередь. Запись создаётся в текущей транзакции:
+    при откате запроса задача тоже исчезает.
+    """
+    from .models import Job
+
+    if task_name not in _registry:
+        raise KeyError(f"Неизвестная задача {task_name}")
+    return Job.objects.create(
+        task=task_name,
+        payload=payload or {},
+        queue=queue,
+        priority=priority,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.PASS_JOBS_MAX_ATTEMPTS,
+    )
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед повтором со случайным разбросом"""
+    base = settings.PASS_JOBS_RETRY_BASE * 2 ** max(attempts - 1, 0)
+    delay = min(base, settings.PASS_JOBS_RETRY_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim(worker_id, queues=('default',), limit=1):
+    """
+    Забирает до limit готовых задач. На PostgreSQL строки выбираются
+    с FOR UPDATE SKIP LOCKED, поэтому обработчики не ждут друг друга.
+    """
+    from .models import Job
+
+    now = timezone.now()
+    with transaction.atomic():
+        ready = Job.objects.filter(
+            queue__in=queues, status='queued', run_at__lte=now
+        ).order_by('-priority', 'run_at', 'pk')
+        if connection.features.has_select_for_update_skip_locked:
+            ready = ready.select_for_update(skip_locked=True)
+        ids = list(ready.values_list('pk', flat=True)[:limit])
+        if not ids:
+            return []
+        # Условие на статус защищает от двойного захвата там, где нет SKIP LOCKED
+        Job.objects.filter(pk__in=ids, status='queued').update(
+            status='running', locked_at=now, locked_by=worker_id, attempts=F('attempts') + 1
+        )
+        return list(
+            Job.objects.filter(pk__in=ids, status='running', locked_by=worker_id, locked_at=now)
+            .order_by('-priority', 'run_at', 'pk')
+        )
+
+
+def execute(job):
+    """Выполняет задачу; успешная удаляется, упавшая откладывается или отбрасывается"""
+    from .models import Job
+
+    try:
+        func = _registry[job.task]
+        func(**job.payload)
+    except Exception as e:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            Job.objects.filter(pk=job.pk).update(status='dead', last_error=error, locked_by='')
+            logger.error("Задача %s отброшена после %s попыток: %s", job, job.attempts, e)
+        else:
+            Job.objects.filter(pk=job.pk).update(
+                status='queued',
+                run_at=timezone.now() + timedelta(seconds=retry_delay(job.attempts)),
+                last_error=error,
+                locked_by='',
+            )
+            logger.warning("Задача %s упала, попытка %s: %s", job, job.attempts, e)
+        return False
+    Job.objects.filter(pk=job.pk).delete()
+    return True
+
+
+def requeue_stale(timeout):
+    """
+    Возвращает в очередь задачи обработчиков, которые упали, не закончив работу.
+    Попытка уже засчитана при захвате (claim); задача, исчерпавшая попытки,
+    отбрасывается: иначе задача, роняющая обработчик, крутилась бы бесконечно.
+    Возвращает число задач, поставленных обратно в очередь.
+    """
+    from .models import Job
+
+    stale = Job.objects.filter(
+        status='running', locked_at__lt=timezone.now() - timedelta(seconds=timeout)
+    )
+    error = f"Обработчик потерян: задача не завершилась за {timeout} с"
+    dead = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='dead', last_error=error, locked_by=''
+    )
+    if dead:
+        logger.error("Отброшено задач потерянных обработчиков: %s", dead)
+    return stale.update(status='queued', last_error=error, locked_by='')
+
+
+def run_worker(queues=('default',), worker_id=None, burst=False, batch_size=10, poll_interval=1.0):
+    """
+    Цикл обработчика. В режиме burst завершается, когда очередь пуста.
+    Брошенные задачи возвращаются в очередь по таймеру, в том числе
+    когда очередь не пустеет. Возвращает число выполненных задач.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    processed = 0
+    next_requeue = time.monotonic()
+    while True:
+        close_old_connections()
+        if time.monotonic() >= next_requeue:
+            requeue_stale(settings.PASS_JOBS_STALE_TIMEOUT)
+            next_requeue = time.monotonic() + settings.PASS_JOBS_REQUEUE_INTERVAL
+        jobs = claim(worker_id, queues, batch_size)
+        for job in jobs:
+            execute(job)
+            processed += 1
+        if not jobs:
+            if burst:
+                return processed
+            time.sleep(poll_interval)
+
+
+def _init_process(settings_module):
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def run_worker_pool(concurrency, **options):
+    """Запускает concurrency обработчиков в отдельных процессах"""
+    if concurrency <= 1:
+        return run_worker(**options)
+
+    from django.db import connections
+
+    # Дочерние процессы открывают свои соединения
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=concurrency,
+        initializer=_init_process,
+        initargs=(os.environ['DJANGO_SETTINGS_MODULE'],),
+    ) as pool:
+        futures = [pool.submit(run_worker, **options) for _ in range(concurrency)]
+        wait(futures)
+        return sum(future.result() for future in futures)
@@ -0,0 +1,154 @@
+"""Логирование без блокировки запросов: очередь, JSON-записи, выборка, ротация"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+
+# Стандартные атрибуты LogRecord; всё остальное пришло через extra=
+RESERVED_ATTRS = set(logging.LogRecord('', 0, '', 0, '', (), None).__dict__) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись - одна строка JSON; поля из extra= попадают в запись как есть"""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRS and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exc'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Пропускает долю rate записей уровня INFO и ниже; предупреждения
+    и ошибки проходят всегда. Доля сохраняется в записи как sample_rate.
+    """
+
+    def __init__(self, rate=1.0, name=''):
+        super().__init__(name)
+        self.rate = float(rate)
+
+    def filter(self, record):
+        if record.levelno > logging.INFO or self.rate >= 1:
+            return True
+        if random.random() >= self.rate:
+            return False
+        record.sample_rate = self.rate
+        return True
+
+
+class SizedTimedRotatingFileHandler(TimedRotatingFileHandler):
+    """Ротация по времени (when) или при превышении max_bytes, что наступит раньше"""
+
+    def __init__(self, filename, max_bytes=0, **kwargs):
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        super().__init__(filename, **kwargs)
+        self.max_bytes = max_bytes
+
+    def shouldRollover(self, record):
+        if super().shouldRollover(record):
+            return True
+        if self.max_bytes > 0 and self.stream is not None:
+            return self.stream.tell() >= self.max_bytes
+        return False
+
+    def rotation_filename(self, default_name):
+        # Ротации по размеру внутри одного интервала получают тот же суффикс
+        # даты, и doRollover удалил бы предыдущую копию. Занятое имя получает
+        # счётчик: debug.log.2026-10-19.001 - он сортируется после копии без
+        # счётчика, и backupCount по-прежнему находит все копии по дате
+        counter = 0
+        while True:
+            candidate = default_name if counter == 0 else f"{default_name}.{counter:03d}"
+            name = super().rotation_filename(candidate)
+            if not os.path.exists(name):
+                return name
+            counter += 1
+
+
+class BlockingStopListener(QueueListener):
+    """При остановке ждёт места в очереди, чтобы не потерять оставшиеся записи"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    Обработчик, который только кладёт запись в очередь. Запись в файл
+    и консоль выполняет фоновый поток QueueListener. При переполнении
+    очереди записи отбрасываются, поток запроса никогда не ждёт.
+
+    handlers - имена обработчиков из LOGGING; в dictConfig обработчики
+    создаются по алфавиту, поэтому имя этого должно идти после них.
+    """
+
+    def __init__(self, handlers, queue_size=10000):
+        super().__init__(queue.Queue(queue_size))
+        get_handler = getattr(logging, 'getHandlerByName', logging._handlers.get)
+        self.targets = []
+        for name in handlers:
+            handler = get_handler(name)
+            if handler is None:
+                raise ValueError(f"Обработчик {name} не настроен до {type(self).__name__}")
+            self.targets.append(handler)
+        self.dropped = 0
+        self.listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        atexit.register(self.stop)
+
+    def _ensure_listener(self):
+        # Поток слушателя не переживает fork, в дочернем процессе запускается заново
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self.listener = BlockingStopListener(self.queue, *self.targets, respect_handler_level=True)
+                self.listener.start()
+                self._pid = os.getpid()
+
+    def prepare(self, record):
+        # Сообщение собирается здесь, чтобы в очередь не уходили изменяемые args
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record):
+        self._ensure_listener()
+        super().emit(record)
+
+    def stop(self):
+        """Дописывает оставшиеся записи и останавливает поток"""
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+            self._pid = None
@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from passes.archive import archivable, archive_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит принятые и отклонённые перевалы старше порога вместе с координатами, "
+        "уровнем и изображениями в архивные таблицы. Каждая пачка - отдельная транзакция, "
+        "прерванный запуск можно повторить"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=settings.PASS_ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=settings.PASS_ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, default=0, help="0 - пока есть что переносить")
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help="Пауза между пачками (сек), чтобы не нагружать primary и реплики"
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Только посчитать перевалы для архивации")
+
+    def handle(self, *args, **options):
+        days = options['older_than_days']
+        if options['dry_run']:
+            count = archivable(days).count()
+            self.stdout.write(f"К архивации: {count}")
+            return
+
+        total = batches = 0
+        while not options['max_batches'] or batches < options['max_batches']:
+            moved = archive_batch(days, options['batch_size'])
+            if not moved:
+                break
+            total += moved
+            batches += 1
+            self.stdout.write(f"Пачка {batches}: перенесено {moved}, всего {total}")
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(f"Перенесено в архив: {total}"))
@@ -0,0 +1,60 @@
+import statistics
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory, override_settings
+
+from passes.dbpool import pool_stats
+from passes.models import MountainPass
+
+
+class Command(BaseCommand):
+    help = (
+        "Замер задержки GET /api/submitData/<id>/ через полный WSGI-цикл: "
+        "новое соединение на запрос и текущая настройка (постоянные соединения или пул)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+
+    def _run(self, path, count):
+        handler = WSGIHandler()
+        environ = RequestFactory(HTTP_HOST='localhost').get(path).environ
+        latencies = []
+        for _ in range(count):
+            started = time.perf_counter()
+            response = handler(dict(environ), lambda status, headers: None)
+            b''.join(response)
+            # close() отправляет request_finished: здесь Django закрывает
+            # соединение или оставляет его открытым по CONN_MAX_AGE
+            response.close()
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        return statistics.mean(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+    def handle(self, *args, **options):
+        mountain_pass = MountainPass.objects.order_by('pk').first()
+        if mountain_pass is None:
+            raise CommandError("Нет перевалов для замера, создайте хотя бы один")
+        path = f"/api/submitData/{mountain_pass.pk}/"
+        count = options['requests']
+
+        configured_max_age = connection.settings_dict['CONN_MAX_AGE']
+        pooled = getattr(connection, 'pool', None) is not None
+        runs = [("текущая настройка", configured_max_age)]
+        if not pooled:
+            runs.insert(0, ("соединение на запрос", 0))
+
+        # Лимиты частоты отключены, иначе замер упрётся в 429
+        try:
+            for name, max_age in runs:
+                connection.close()
+                connection.settings_dict['CONN_MAX_AGE'] = max_age
+                with override_settings(PASS_THROTTLE_ENABLED=False):
+                    mean, p95 = self._run(path, count)
+                self.stdout.write(f"{name}: среднее {mean:.2f} мс, p95 {p95:.2f} мс")
+        finally:
+            connection.settings_dict['CONN_MAX_AGE'] = configured_max_age
+        self.stdout.write(f"соединения: {pool_stats()}")
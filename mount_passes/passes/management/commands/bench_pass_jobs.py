@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from passes.jobs import run_worker_pool
+from passes.models import Job
+
+
+class Command(BaseCommand):
+    help = "Замер пропускной способности очереди задач на пустых задачах"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4])
+        parser.add_argument('--batch-size', type=int, default=10)
+
+    def handle(self, *args, **options):
+        for concurrency in options['concurrency']:
+            Job.objects.filter(queue='bench').delete()
+
+            started = time.perf_counter()
+            Job.objects.bulk_create(
+                [Job(task='passes.noop', queue='bench') for _ in range(options['jobs'])],
+                batch_size=1000
+            )
+            enqueued = time.perf_counter() - started
+
+            started = time.perf_counter()
+            processed = run_worker_pool(
+                concurrency, queues=('bench',), burst=True, batch_size=options['batch_size']
+            )
+            elapsed = time.perf_counter() - started
+
+            self.stdout.write(
+                f"обработчиков {concurrency}: постановка {options['jobs'] / enqueued:.0f} задач/с, "
+                f"выполнение {processed} задач за {elapsed:.2f} с ({processed / elapsed:.0f} задач/с)"
+            )
@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from passes.throttling import CacheBuckets, IPThrottle, LocalBuckets, parse_rate
+
+
+class Command(BaseCommand):
+    help = "Замер накладных расходов ограничителя запросов на один запрос"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100_000)
+        parser.add_argument('--keys', type=int, default=1000, help="Число разных клиентов")
+        parser.add_argument('--cache', default=settings.PASS_THROTTLE_CACHE,
+                            help="Алиас кэша для замера общих вёдер")
+
+    def _measure(self, name, consume, count, keys):
+        capacity, interval = parse_rate('1000000/s')
+        started = time.perf_counter()
+        for i in range(count):
+            consume(f"bench:{i % keys}", capacity, interval)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{name}: {elapsed / count * 1_000_000:.2f} мкс/запрос")
+
+    def handle(self, *args, **options):
+        count, keys = options['requests'], options['keys']
+        self._measure("локальные вёдра", LocalBuckets().consume, count, keys)
+        if options['cache']:
+            buckets = CacheBuckets(caches[options['cache']])
+            self._measure(f"кэш '{options['cache']}'", buckets.consume, count, keys)
+
+        # Полная проверка DRF-throttle, включая разбор IP из запроса
+        throttle = IPThrottle()
+        request = Request(RequestFactory().get('/api/submitData/'))
+        started = time.perf_counter()
+        for _ in range(count):
+            throttle.allow_request(request, None)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"IPThrottle.allow_request: {elapsed / count * 1_000_000:.2f} мкс/запрос")
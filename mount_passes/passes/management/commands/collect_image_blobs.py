@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from passes.models import ArchivedPassImage, ImageBlob, PassImage, UploadSession
+from passes.storage import TMP_DIR, pass_image_storage
+
+
+class Command(BaseCommand):
+    help = "Удаляет файлы изображений без ссылок и брошенные загрузки"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours', type=int, default=settings.PASS_IMAGE_BLOB_GRACE_HOURS,
+            help="Не трогать файлы, использованные позже этого срока"
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Только показать, что будет удалено")
+        parser.add_argument(
+            '--scan', action='store_true',
+            help="Дополнительно обойти каталоги и найти файлы без записи ImageBlob"
+        )
+
+    def handle(self, *args, **options):
+        storage = pass_image_storage()
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        dry_run = options['dry_run']
+        removed = 0
+
+        candidates = ImageBlob.objects.filter(ref_count__lte=0, updated_at__lt=cutoff)
+        for pk in candidates.values_list('pk', flat=True).iterator():
+            # Строка заблокирована до удаления файла: повторная загрузка того же
+            # содержимого (register_blob) дождётся конца и создаст файл заново
+            with transaction.atomic():
+                blob = candidates.select_for_update().filter(pk=pk).first()
+                if blob is None:
+                    # Файл снова использован, пока шёл обход
+                    continue
+                # Счётчик мог разойтись с данными: перепроверяем по таблице изображений
+                references = (
+                    PassImage.objects.filter(image=blob.name).count()
+                    + ArchivedPassImage.objects.filter(image=blob.name).count()
+                )
+                if references:
+                    if not dry_run:
+                        ImageBlob.objects.filter(pk=blob.pk).update(ref_count=references)
+                    continue
+                self.stdout.write(f"Удаление {blob.name}")
+                if dry_run:
+                    removed += 1
+                    continue
+                deleted, _ = ImageBlob.objects.filter(
+                    pk=blob.pk, ref_count__lte=0, updated_at__lt=cutoff
+                ).delete()
+                if deleted == 1:
+                    storage.delete(blob.name)
+                    removed += 1
+
+        if options['scan']:
+            removed += self.scan_orphans(storage, cutoff, dry_run)
+
+        removed += self.collect_sessions(dry_run)
+
+        self.stdout.write(self.style.SUCCESS(f"Удалено файлов: {removed}"))
+
+    def collect_sessions(self, dry_run):
+        """Брошенные возобновляемые загрузки и их недокачанные файлы"""
+        cutoff = timezone.now() - timedelta(hours=settings.PASS_UPLOAD_SESSION_TTL_HOURS)
+        removed = 0
+        for session in UploadSession.objects.filter(status='active', updated_at__lt=cutoff).iterator():
+            self.stdout.write(f"Удаление незавершённой загрузки {session.pk}")
+            if not dry_run:
+                session.part_path.unlink(missing_ok=True)
+                session.delete()
+            removed += 1
+        return removed
+
+    def walk(self, storage, directory):
+        """Имена всех файлов под directory через storage.listdir (диск или S3)"""
+        try:
+            directories, files = storage.listdir(directory)
+        except FileNotFoundError:
+            return
+        for filename in files:
+            yield f"{directory}/{filename}"
+        for child in directories:
+            yield from self.walk(storage, f"{directory}/{child}")
+
+    def scan_orphans(self, storage, cutoff, dry_run):
+        """
+        Файлы, оставшиеся после сбоя между записью в хранилище и в БД,
+        и объекты, загруженные по слотам, но так и не подтверждённые
+        """
+        root = getattr(storage, 'prefix', None) or settings.PASS_UPLOAD_PREFIX
+        removed = 0
+        for name in self.walk(storage, root):
+            if storage.get_modified_time(name) >= cutoff:
+                continue
+            is_tmp = name.rsplit('/', 2)[-2] == TMP_DIR
+            if not is_tmp and (
+                ImageBlob.objects.filter(name=name).exists()
+                or PassImage.objects.filter(image=name).exists()
+                or ArchivedPassImage.objects.filter(image=name).exists()
+            ):
+                continue
+            self.stdout.write(f"Удаление {name}")
+            if not dry_run:
+                storage.delete(name)
+            removed += 1
+        return removed
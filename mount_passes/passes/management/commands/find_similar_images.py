@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from passes.hashing import get_phash_index
+from passes.models import PassImage
+
+
+class Command(BaseCommand):
+    help = "Ищет точные дубликаты и похожие изображения перевалов"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--distance', type=int, default=6, help="Максимальное расстояние Хэмминга для pHash")
+
+    def handle(self, *args, **options):
+        exact = (
+            PassImage.objects.exclude(sha256='')
+            .values('sha256')
+            .annotate(files=Count('image', distinct=True), rows=Count('id'))
+            .filter(rows__gt=1)
+        )
+        for group in exact:
+            self.stdout.write(
+                f"SHA-256 {group['sha256'][:12]}: записей {group['rows']}, файлов {group['files']}"
+            )
+
+        index = get_phash_index(rebuild=True)
+        seen = set()
+        for image_id, value in PassImage.objects.exclude(phash='').values_list('id', 'phash').iterator():
+            if image_id in seen:
+                continue
+            group = [
+                (distance, other_id) for distance, other_id in index.search(value, options['distance'])
+                if other_id != image_id
+            ]
+            if not group:
+                continue
+            seen.update(other_id for _, other_id in group)
+            similar = ", ".join(f"{other_id} (d={distance})" for distance, other_id in group)
+            self.stdout.write(f"Изображение {image_id} похоже на: {similar}")
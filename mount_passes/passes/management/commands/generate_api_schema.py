@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from passes.schema import FORMATS, generate_schema, schema_path, schema_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Генерирует схему OpenAPI текущей версии кода в PASS_SCHEMA_DIR. "
+        "Запускается при деплое, чтобы первый запрос к документации не строил схему"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help="Только проверить, что схема текущей версии есть")
+        parser.add_argument('--keep-old', action='store_true', help="Не удалять схемы прошлых версий")
+
+    def handle(self, *args, **options):
+        version = schema_version()
+        if options['check']:
+            missing = [fmt for fmt in FORMATS if not schema_path(fmt).exists()]
+            if missing:
+                raise CommandError(f"Нет схемы версии {version}: {', '.join(missing)}")
+            self.stdout.write(self.style.SUCCESS(f"Схема версии {version} на месте"))
+            return
+
+        for path in generate_schema().values():
+            self.stdout.write(f"Записано {path}")
+        if not options['keep_old']:
+            current = {schema_path(fmt).name for fmt in FORMATS}
+            for path in Path(settings.PASS_SCHEMA_DIR).glob('openapi-*'):
+                if path.name not in current:
+                    path.unlink()
+                    self.stdout.write(f"Удалена старая схема {path.name}")
+        self.stdout.write(self.style.SUCCESS(f"Схема версии {version} готова"))
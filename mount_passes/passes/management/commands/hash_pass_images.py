@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from passes.hashing import compute_image_hashes
+from passes.models import PassImage
+
+
+class Command(BaseCommand):
+    help = "Вычисляет SHA-256/pHash/dHash для изображений без хэшей"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Пересчитать хэши всех изображений")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        queryset = PassImage.objects.order_by('pk')
+        if not options['all']:
+            queryset = queryset.filter(sha256='')
+
+        processed = failed = 0
+        for image in queryset.iterator(chunk_size=options['batch_size']):
+            try:
+                compute_image_hashes(image)
+                processed += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Изображение {image.pk}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Обработано изображений: {processed}, с ошибками: {failed}"
+        ))
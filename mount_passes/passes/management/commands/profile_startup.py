@@ -0,0 +1,80 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from passes.startup import aggregate_by_package, parse_importtime
+
+# Выполняется в отдельном процессе с -X importtime: холодный старт как у нового воркера
+PROBE = """
+import importlib, io, json, sys, time
+started = time.perf_counter()
+application = getattr(importlib.import_module(sys.argv[1]), 'application')
+loaded = time.perf_counter()
+environ = {
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': sys.argv[2], 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+    'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost', 'REMOTE_ADDR': '127.0.0.1',
+    'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+}
+statuses = []
+response = application(environ, lambda status, headers: statuses.append(status))
+b''.join(response)
+response.close()
+finished = time.perf_counter()
+print(json.dumps({'load': loaded - started, 'first_request': finished - loaded, 'status': statuses[0]}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Холодный старт воркера в отдельном процессе: время загрузки WSGI-приложения, "
+        "первого запроса и стоимость импортов по пакетам (python -X importtime)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/', help="Путь первого запроса")
+        parser.add_argument('--limit', type=int, default=15, help="Сколько пакетов/модулей показать")
+        parser.add_argument('--modules', action='store_true', help="Показать самые дорогие модули, а не пакеты")
+        parser.add_argument(
+            '--warm-up', choices=('on', 'off', 'both'), default='both',
+            help="Запуск с прогревом PASS_WARM_UP, без него или оба для сравнения",
+        )
+
+    def _probe(self, module, path, warm_up):
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'mount_passes.settings')
+        env['PASS_WARM_UP'] = str(warm_up)
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE, module, path],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Процесс замера завершился с ошибкой:\n{result.stderr[-2000:]}")
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        return timings, parse_importtime(result.stderr)
+
+    def handle(self, *args, **options):
+        module = settings.WSGI_APPLICATION.rsplit('.', 1)[0]
+        modes = {'on': [True], 'off': [False], 'both': [False, True]}[options['warm_up']]
+        limit = options['limit']
+
+        for warm_up in modes:
+            timings, modules = self._probe(module, options['path'], warm_up)
+            total = timings['load'] + timings['first_request']
+            self.stdout.write(
+                f"прогрев {'вкл' if warm_up else 'выкл'}: загрузка {timings['load'] * 1000:.0f} мс, "
+                f"первый запрос {timings['first_request'] * 1000:.0f} мс ({timings['status']}), "
+                f"всего {total * 1000:.0f} мс, модулей {len(modules)}"
+            )
+
+        self.stdout.write("\nимпорты (последний запуск), собственное время:")
+        if options['modules']:
+            rows = sorted(modules, key=lambda item: item[1], reverse=True)[:limit]
+            for name, self_us, cumulative_us, _ in rows:
+                self.stdout.write(f"  {self_us / 1000:8.1f} мс  {cumulative_us / 1000:8.1f} мс всего  {name}")
+        else:
+            for package, self_us, count in aggregate_by_package(modules)[:limit]:
+                self.stdout.write(f"  {self_us / 1000:8.1f} мс  {count:4d} мод.  {package}")
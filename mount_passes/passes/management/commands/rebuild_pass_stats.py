@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from passes.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "Полностью пересчитывает счётчики статистики перевалов (GET /api/stats/)"
+
+    def handle(self, *args, **options):
+        counts = rebuild_stats()
+        self.stdout.write(self.style.SUCCESS(f"Пересчитано счётчиков: {len(counts)}"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from passes.jobs import run_worker_pool
+
+
+class Command(BaseCommand):
+    help = "Запускает обработчики фоновой очереди задач"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1, help="Число процессов-обработчиков")
+        parser.add_argument('--queue', action='append', dest='queues', help="Очередь (можно несколько)")
+        parser.add_argument('--batch-size', type=int, default=10, help="Сколько задач забирать за раз")
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument('--burst', action='store_true', help="Завершиться, когда очередь опустеет")
+
+    def handle(self, *args, **options):
+        queues = tuple(options['queues'] or ['default'])
+        self.stdout.write(f"Обработчиков: {options['concurrency']}, очереди: {', '.join(queues)}")
+        try:
+            processed = run_worker_pool(
+                options['concurrency'],
+                queues=queues,
+                burst=options['burst'],
+                batch_size=options['batch_size'],
+                poll_interval=options['poll_interval'],
+            )
+        except KeyboardInterrupt:
+            return
+        self.stdout.write(self.style.SUCCESS(f"Выполнено задач: {processed}"))
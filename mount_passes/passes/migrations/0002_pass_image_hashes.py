@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('passes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='passimage',
+            name='dhash',
+            field=models.CharField(blank=True, default='', max_length=16, verbose_name='dHash'),
+        ),
+        migrations.AddField(
+            model_name='passimage',
+            name='phash',
+            field=models.CharField(blank=True, default='', max_length=16, verbose_name='pHash'),
+        ),
+        migrations.AddField(
+            model_name='passimage',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64, verbose_name='SHA-256'),
+        ),
+    ]
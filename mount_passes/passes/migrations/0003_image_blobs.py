@@ -0,0 +1,36 @@
+# Generated by Django 6.0 on 2026-10-19 12:00
+
+import passes.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('passes', '0002_pass_image_hashes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='passimage',
+            name='image',
+            field=models.ImageField(storage=passes.storage.pass_image_storage, upload_to='pass_images/%Y/%m/%d/', verbose_name='Изображение'),
+        ),
+        migrations.CreateModel(
+            name='ImageBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Путь')),
+                ('sha256', models.CharField(max_length=64, verbose_name='SHA-256')),
+                ('size', models.BigIntegerField(verbose_name='Размер')),
+                ('ref_count', models.IntegerField(default=0, verbose_name='Ссылок')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Последнее использование')),
+            ],
+            options={
+                'verbose_name': 'Файл изображения',
+                'verbose_name_plural': 'Файлы изображений',
+                'indexes': [models.Index(fields=['ref_count', 'updated_at'], name='passes_imag_ref_cou_f4a1e0_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('passes', '0007_notification_outbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mountainpass',
+            index=models.Index(fields=['update_time'], name='passes_moun_update__c31378_idx'),
+        ),
+    ]
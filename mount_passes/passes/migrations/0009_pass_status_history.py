@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-19 12:00
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('passes', '0008_mountainpass_update_time_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PassStatusHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(choices=[('new', 'Новый'), ('pending', 'На модерации'), ('accepted', 'Принят'), ('rejected', 'Отклонен')], max_length=10, verbose_name='Был статус')),
+                ('to_status', models.CharField(choices=[('new', 'Новый'), ('pending', 'На модерации'), ('accepted', 'Принят'), ('rejected', 'Отклонен')], max_length=10, verbose_name='Стал статус')),
+                ('actor', models.CharField(blank=True, default='', max_length=150, verbose_name='Кто изменил')),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Время изменения')),
+                ('mountain_pass', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='status_history', to='passes.mountainpass', verbose_name='Перевал')),
+            ],
+            options={
+                'verbose_name': 'Смена статуса',
+                'verbose_name_plural': 'История статусов',
+                'ordering': ['changed_at', 'pk'],
+                'indexes': [models.Index(fields=['mountain_pass', 'changed_at'], name='passes_history_pass_idx'), models.Index(fields=['changed_at', 'to_status'], name='passes_history_day_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('passes', '0009_pass_status_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PassStatsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=20, verbose_name='Метрика')),
+                ('bucket', models.CharField(max_length=20, verbose_name='Значение')),
+                ('count', models.BigIntegerField(default=0, verbose_name='Количество')),
+            ],
+            options={
+                'verbose_name': 'Счётчик статистики',
+                'verbose_name_plural': 'Статистика',
+                'constraints': [models.UniqueConstraint(fields=('metric', 'bucket'), name='passes_stats_metric_bucket_uniq')],
+            },
+        ),
+    ]
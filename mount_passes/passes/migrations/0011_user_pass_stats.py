@@ -0,0 +1,44 @@
+# Generated by Django 6.0 on 2026-10-19 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+STATUSES = ('new', 'pending', 'accepted', 'rejected')
+
+
+def fill_user_pass_stats(apps, schema_editor):
+    MountainPass = apps.get_model('passes', 'MountainPass')
+    UserPassStats = apps.get_model('passes', 'UserPassStats')
+
+    rows = MountainPass.objects.values('user_id').annotate(
+        total=Count('id'),
+        **{status: Count('id', filter=Q(status=status)) for status in STATUSES}
+    ).order_by()
+    UserPassStats.objects.bulk_create((UserPassStats(**row) for row in rows), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('passes', '0010_pass_stats_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserPassStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='pass_stats', serialize=False, to='passes.user', verbose_name='Пользователь')),
+                ('total', models.IntegerField(default=0, verbose_name='Всего')),
+                ('new', models.IntegerField(default=0, verbose_name='Новых')),
+                ('pending', models.IntegerField(default=0, verbose_name='На модерации')),
+                ('accepted', models.IntegerField(default=0, verbose_name='Принято')),
+                ('rejected', models.IntegerField(default=0, verbose_name='Отклонено')),
+            ],
+            options={
+                'verbose_name': 'Счётчики пользователя',
+                'verbose_name_plural': 'Счётчики пользователей',
+            },
+        ),
+        migrations.RunPython(fill_user_pass_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 6.0 on 2026-10-19 12:00
+
+import django.db.models.deletion
+import django.utils.timezone
+import passes.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('passes', '0011_user_pass_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPass',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('beauty_title', models.CharField(max_length=255, verbose_name='Тип объекта')),
+                ('title', models.CharField(max_length=255, verbose_name='Название')),
+                ('other_titles', models.CharField(blank=True, max_length=255, null=True, verbose_name='Другое название')),
+                ('connect', models.TextField(blank=True, null=True, verbose_name='Соединяет')),
+                ('latitude', models.DecimalField(decimal_places=6, max_digits=9, verbose_name='Широта')),
+                ('longitude', models.DecimalField(decimal_places=6, max_digits=9, verbose_name='Долгота')),
+                ('height', models.IntegerField(verbose_name='Высота')),
+                ('winter', models.CharField(blank=True, choices=[('1A', '1А'), ('1B', '1Б'), ('2A', '2А'), ('2B', '2Б'), ('3A', '3А'), ('3B', '3Б')], max_length=2, null=True, verbose_name='Зима')),
+                ('summer', models.CharField(blank=True, choices=[('1A', '1А'), ('1B', '1Б'), ('2A', '2А'), ('2B', '2Б'), ('3A', '3А'), ('3B', '3Б')], max_length=2, null=True, verbose_name='Лето')),
+                ('autumn', models.CharField(blank=True, choices=[('1A', '1А'), ('1B', '1Б'), ('2A', '2А'), ('2B', '2Б'), ('3A', '3А'), ('3B', '3Б')], max_length=2, null=True, verbose_name='Осень')),
+                ('spring', models.CharField(blank=True, choices=[('1A', '1А'), ('1B', '1Б'), ('2A', '2А'), ('2B', '2Б'), ('3A', '3А'), ('3B', '3Б')], max_length=2, null=True, verbose_name='Весна')),
+                ('add_time', models.DateTimeField(verbose_name='Время добавления')),
+                ('update_time', models.DateTimeField(verbose_name='Время обновления')),
+                ('status', models.CharField(choices=[('new', 'Новый'), ('pending', 'На модерации'), ('accepted', 'Принят'), ('rejected', 'Отклонен')], max_length=10, verbose_name='Статус')),
+                ('version', models.PositiveIntegerField(default=1, verbose_name='Версия')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Время архивации')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_passes', to='passes.user', verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Архивный перевал',
+                'verbose_name_plural': 'Архив перевалов',
+                'ordering': ['-add_time'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedPassImage',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255, verbose_name='Название')),
+                ('image', models.ImageField(storage=passes.storage.pass_image_storage, upload_to='', verbose_name='Изображение')),
+                ('sha256', models.CharField(blank=True, default='', max_length=64, verbose_name='SHA-256')),
+                ('phash', models.CharField(blank=True, default='', max_length=16, verbose_name='pHash')),
+                ('dhash', models.CharField(blank=True, default='', max_length=16, verbose_name='dHash')),
+                ('created_at', models.DateTimeField(verbose_name='Дата создания')),
+                ('mountain_pass', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='passes.archivedpass', verbose_name='Перевал')),
+            ],
+            options={
+                'verbose_name': 'Изображение архивного перевала',
+                'verbose_name_plural': 'Изображения архивных перевалов',
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedpass',
+            index=models.Index(fields=['user', 'add_time'], name='passes_archive_user_idx'),
+        ),
+    ]
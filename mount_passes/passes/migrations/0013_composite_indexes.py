@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('passes', '0012_pass_archive'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='mountainpass',
+            name='passes_moun_status_21a37e_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='mountainpass',
+            name='passes_moun_user_id_e01987_idx',
+        ),
+        migrations.AddIndex(
+            model_name='archivedpassimage',
+            index=models.Index(fields=['mountain_pass', 'created_at'], name='passes_archive_image_pass_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mountainpass',
+            index=models.Index(fields=['status', '-add_time'], name='passes_status_added_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mountainpass',
+            index=models.Index(fields=['user', '-add_time'], name='passes_user_added_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passimage',
+            index=models.Index(fields=['mountain_pass', 'created_at'], name='passes_image_pass_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('passes', '0013_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mountainpass',
+            index=models.Index(fields=['title'], name='passes_title_idx'),
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 6.0 on 2026-10-19 12:00
+
+from django.db import migrations, models
+from django.db.models import Case, OuterRef, Subquery, Value, When
+
+SEASONS = ('winter', 'summer', 'autumn', 'spring')
+LEVEL_RANKS = {'1A': 1, '1B': 2, '2A': 3, '2B': 4, '3A': 5, '3B': 6}
+
+
+def fill_filter_fields(apps, schema_editor):
+    MountainPass = apps.get_model('passes', 'MountainPass')
+    Coords = apps.get_model('passes', 'Coords')
+    Level = apps.get_model('passes', 'Level')
+
+    coords = Coords.objects.filter(pk=OuterRef('coords_id'))
+    level = Level.objects.filter(pk=OuterRef('level_id'))
+
+    def rank(season):
+        return Subquery(level.annotate(rank=Case(
+            *[When(**{season: code}, then=Value(value)) for code, value in LEVEL_RANKS.items()],
+            output_field=models.PositiveSmallIntegerField(),
+        )).values('rank'))
+
+    MountainPass.objects.update(
+        latitude=Subquery(coords.values('latitude')),
+        longitude=Subquery(coords.values('longitude')),
+        height=Subquery(coords.values('height')),
+        **{f"{season}_rank": rank(season) for season in SEASONS},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('passes', '0014_title_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mountainpass',
+            name='autumn_rank',
+            field=models.PositiveSmallIntegerField(editable=False, null=True, verbose_name='Сложность осенью'),
+        ),
+        migrations.AddField(
+            model_name='mountainpass',
+            name='height',
+            field=models.IntegerField(editable=False, null=True, verbose_name='Высота'),
+        ),
+        migrations.AddField(
+            model_name='mountainpass',
+            name='latitude',
+            field=models.DecimalField(decimal_places=6, editable=False, max_digits=9, null=True, verbose_name='Широта'),
+        ),
+        migrations.AddField(
+            model_name='mountainpass',
+            name='longitude',
+            field=models.DecimalField(decimal_places=6, editable=False, max_digits=9, null=True, verbose_name='Долгота'),
+        ),
+        migrations.AddField(
+            model_name='mountainpass',
+            name='spring_rank',
+            field=models.PositiveSmallIntegerField(editable=False, null=True, verbose_name='Сложность весной'),
+        ),
+        migrations.AddField(
+            model_name='mountainpass',
+            name='summer_rank',
+            field=models.PositiveSmallIntegerField(editable=False, null=True, verbose_name='Сложность летом'),
+        ),
+        migrations.AddField(
+            model_name='mountainpass',
+            name='winter_rank',
+            field=models.PositiveSmallIntegerField(editable=False, null=True, verbose_name='Сложность зимой'),
+        ),
+        migrations.RunPython(fill_filter_fields, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='mountainpass',
+            index=models.Index(fields=['status', 'summer_rank', 'height'], name='passes_status_summer_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mountainpass',
+            index=models.Index(fields=['status', 'winter_rank', 'height'], name='passes_status_winter_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mountainpass',
+            index=models.Index(fields=['status', 'height'], name='passes_status_height_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mountainpass',
+            index=models.Index(fields=['latitude', 'longitude'], name='passes_lat_lon_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('passes', '0015_pass_filter_fields'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='mountainpass',
+            name='passes_title_idx',
+        ),
+        migrations.AddIndex(
+            model_name='mountainpass',
+            index=models.Index(fields=['title'], name='passes_title_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-19 12:00
+
+from django.db import migrations
+
+from passes.stats import count_passes
+
+
+def fill_pass_stats_rollup(apps, schema_editor):
+    MountainPass = apps.get_model('passes', 'MountainPass')
+    ArchivedPass = apps.get_model('passes', 'ArchivedPass')
+    PassStatsRollup = apps.get_model('passes', 'PassStatsRollup')
+
+    counts = count_passes(MountainPass.objects.all(), ArchivedPass.objects.all())
+    PassStatsRollup.objects.all().delete()
+    PassStatsRollup.objects.bulk_create(
+        (PassStatsRollup(metric=metric, bucket=bucket, count=count) for (metric, bucket), count in counts.items()),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('passes', '0016_title_pattern_ops_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_pass_stats_rollup, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,89 @@
+import uuid
+from pathlib import Path
+
+from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
+from django.utils import timezone
+
+from . import detail_cache
+from .storage import pass_image_storage
+
+
+class TrackChangesMixin:
+    """
+    Запоминает значения полей, загруженные из БД, и при сохранении
+    обновляет только изменённые столбцы. Если ничего не изменилось,
+    запрос к БД не выполняется.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_values()
+        return instance
+
+    def _tracked_value(self, field):
+        value = getattr(self, field.attname)
+        if isinstance(field, models.FileField):
+            return value.name
+        return value
 
+    def _remember_loaded_values(self, fields=None):
+        loaded = getattr(self, '_loaded_values', {})
+        for field in self._meta.concrete_fields:
+            if fields is not None and field.attname not in fields and field.name not in fields:
+                continue
+            if field.attname in self.__dict__:
+                loaded[field.attname] = self._tracked_value(field)
+        self._loaded_values = loaded
+
+    def get_dirty_fields(self):
+        """Имена изменённых полей; None, если объект не загружался из БД"""
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return None
+        dirty = []
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.attname not in self.__dict__:
+                continue
+            if field.attname not in loaded or loaded[field.attname] != self._tracked_value(field):
+                dirty.append(field.name)
+        return dirty
+
+    def loaded_value(self, field_name):
+        """Значение поля на момент загрузки из БД"""
+        field = self._meta.get_field(field_name)
+        return getattr(self, '_loaded_values', {}).get(field.attname)
+
+    # Поле-счётчик версии, увеличивается при каждом UPDATE
+    version_field = None
+
+    def save(self, *args, **kwargs):
+        if (not self._state.adding and kwargs.get('update_fields') is None
+                and not kwargs.get('force_insert')):
+            dirty = self.get_dirty_fields()
+            if dirty is not None:
+                if not dirty:
+                    return
+                auto_now = [
+                    field.name for field in self._meta.concrete_fields
+                    if getattr(field, 'auto_now', False) and field.name not in dirty
+                ]
+                kwargs['update_fields'] = dirty + auto_now
+        if self.version_field and not self._state.adding:
+            setattr(self, self.version_field, getattr(self, self.version_field) + 1)
+            if kwargs.get('update_fields') is not None and self.version_field not in kwargs['update_fields']:
+                kwargs['update_fields'] = [*kwargs['update_fields'], self.version_field]
+        super().save(*args, **kwargs)
+        self._remember_loaded_values(kwargs.get('update_fields'))
 
-class User(models.Model):
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._remember_loaded_values(kwargs.get('fields'))
+
+
+class User(TrackChangesMixin, models.Model):
     """Модель пользователя (туриста)"""
     email = models.EmailField(unique=True, verbose_name="Email")
     fam = models.CharField(max_length=50, verbose_name="Фамилия")
@@ -28,7 +109,7 @@ class User(models.Model):
             super().save(*args, **kwargs)
 
 
-class Coords(models.Model):
+class Coords(TrackChangesMixin, models.Model):
     """Модель географических координат"""
     latitude = models.DecimalField(
         max_digits=9,
@@ -55,7 +136,7 @@ class Coords(models.Model):
         return f"({self.latitude}, {self.longitude}), высота: {self.height}м"
 
 
-class Level(models.Model):
+class Level(TrackChangesMixin, models.Model):
     """Модель уровня сложности в разные времена года"""
     LEVEL_CHOICES = [
         ('1A', '1А'),
@@ -65,6 +146,9 @@ class Level(models.Model):
         ('3A', '3А'),
         ('3B', '3Б'),
     ]
+    SEASONS = ('winter', 'summer', 'autumn', 'spring')
+    # Порядковый номер категории для сравнения и индексов: 1A=1 ... 3B=6
+    RANKS = {code: rank for rank, (code, _) in enumerate(LEVEL_CHOICES, start=1)}
 
     winter = models.CharField(
         max_length=2,
@@ -108,7 +192,20 @@ class Level(models.Model):
         return ", ".join(seasons) if seasons else "Не указано"
 
 
-class MountainPass(models.Model):
+def denormalized_fields(coords=None, level=None):
+    """
+    Копии координат и порядковых номеров сложности, которые хранятся
+    в MountainPass, чтобы фильтры работали по его индексам без JOIN
+    """
+    values = {}
+    if coords is not None:
+        values.update(latitude=coords.latitude, longitude=coords.longitude, height=coords.height)
+    if level is not None:
+        values.update({f"{season}_rank": Level.RANKS.get(getattr(level, season)) for season in Level.SEASONS})
+    return values
+
+
+class MountainPass(TrackChangesMixin, models.Model):
     """Основная модель перевала"""
     STATUS_CHOICES = [
         ('new', 'Новый'),
@@ -154,29 +251,106 @@ class MountainPass(models.Model):
         default='new',
         verbose_name="Статус"
     )
+    version = models.PositiveIntegerField(default=1, verbose_name="Версия")
+
+    # Копии из Coords и Level для фильтров (см. denormalized_fields)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, editable=False, verbose_name="Широта")
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, editable=False, verbose_name="Долгота")
+    height = models.IntegerField(null=True, editable=False, verbose_name="Высота")
+    winter_rank = models.PositiveSmallIntegerField(null=True, editable=False, verbose_name="Сложность зимой")
+    summer_rank = models.PositiveSmallIntegerField(null=True, editable=False, verbose_name="Сложность летом")
+    autumn_rank = models.PositiveSmallIntegerField(null=True, editable=False, verbose_name="Сложность осенью")
+    spring_rank = models.PositiveSmallIntegerField(null=True, editable=False, verbose_name="Сложность весной")
+
+    version_field = 'version'
 
     class Meta:
         verbose_name = "Перевал"
         verbose_name_plural = "Перевалы"
         ordering = ['-add_time']
         indexes = [
-            models.Index(fields=['status']),
+            # Составные индексы под фильтр с сортировкой по времени:
+            # модерация по статусу и список перевалов пользователя
+            models.Index(fields=['status', '-add_time'], name='passes_status_added_idx'),
             models.Index(fields=['add_time']),
-            models.Index(fields=['user']),
+            models.Index(fields=['user', '-add_time'], name='passes_user_added_idx'),
+            models.Index(fields=['update_time']),
+            # Поиск в админке по началу названия: LIKE 'term%' использует индекс
+            # при любой сортировке БД только с varchar_pattern_ops (PostgreSQL)
+            models.Index(fields=['title'], name='passes_title_idx', opclasses=['varchar_pattern_ops']),
+            # Фильтры списка: статус + сложность летом/зимой + высота, статус + высота, bbox
+            models.Index(fields=['status', 'summer_rank', 'height'], name='passes_status_summer_idx'),
+            models.Index(fields=['status', 'winter_rank', 'height'], name='passes_status_winter_idx'),
+            models.Index(fields=['status', 'height'], name='passes_status_height_idx'),
+            models.Index(fields=['latitude', 'longitude'], name='passes_lat_lon_idx'),
         ]
 
     def __str__(self):
         return f"{self.title} ({self.get_status_display()})"
 
+    def save(self, *args, **kwargs):
+        # Копии координат и сложности обновляются вместе со ссылками на них;
+        # изменения самих Coords и Level переносит сигнал
+        dirty = None if self._state.adding else self.get_dirty_fields()
+        if dirty is None or {'coords', 'level'} & set(dirty):
+            for name, value in denormalized_fields(self.coords, self.level).items():
+                setattr(self, name, value)
+        super().save(*args, **kwargs)
+
     def can_be_edited(self):
         """Проверка, можно ли редактировать перевал"""
         return self.status == 'new'
 
+    @property
+    def etag(self):
+        return f'"{self.version}"'
+
+    def save_if_current(self, expected_version, update_fields=None, require_status=None):
+        """
+        Условное сохранение одним запросом:
+        UPDATE ... SET ..., version = version + 1 WHERE id = ? AND version = ? [AND status = ?].
+        Возвращает False, если запись успели изменить параллельно.
+        """
+        if update_fields is None:
+            update_fields = self.get_dirty_fields() or []
+        values = {
+            self._meta.get_field(name).attname: getattr(self, self._meta.get_field(name).attname)
+            for name in update_fields
+            if name not in ('version', 'update_time')
+        }
+        values['update_time'] = timezone.now()
+        values['version'] = models.F('version') + 1
+
+        filters = {'pk': self.pk, 'version': expected_version}
+        if require_status is not None:
+            filters['status'] = require_status
+        if not MountainPass.objects.filter(**filters).update(**values):
+            return False
+        detail_cache.invalidate([self.pk])
+
+        self.update_time = values['update_time']
+        self.version = expected_version + 1
+        self._remember_loaded_values()
+        return True
+
 
 class PassImage(models.Model):
     """Модель для изображений перевала"""
     title = models.CharField(max_length=255, verbose_name="Название")
-    image = models.ImageField(upload_to='pass_images/%Y/%m/%d/', verbose_name="Изображение")
+    image = models.ImageField(
+        upload_to='pass_images/%Y/%m/%d/',
+        storage=pass_image_storage,
+        verbose_name="Изображение"
+    )
+    sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        db_index=True,
+        verbose_name="SHA-256"
+    )
+    phash = models.CharField(max_length=16, blank=True, default='', verbose_name="pHash")
+    dhash = models.CharField(max_length=16, blank=True, default='', verbose_name="dHash")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
     mountain_pass = models.ForeignKey(
         MountainPass,
@@ -189,6 +363,348 @@ class PassImage(models.Model):
         verbose_name = "Изображение перевала"
         verbose_name_plural = "Изображения перевалов"
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['mountain_pass', 'created_at'], name='passes_image_pass_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} - {self.mountain_pass.title}"
+
+    def find_similar(self, max_distance=6):
+        """Похожие изображения по pHash: список (расстояние, PassImage)"""
+        from .hashing import get_phash_index
+
+        if not self.phash:
+            return []
+        matches = [
+            (distance, image_id)
+            for distance, image_id in get_phash_index().search(self.phash, max_distance)
+            if image_id != self.pk
+        ]
+        images = PassImage.objects.in_bulk([image_id for _, image_id in matches])
+        return [(distance, images[image_id]) for distance, image_id in matches if image_id in images]
+
+
+class ImageBlob(models.Model):
+    """Файл в хранилище изображений и число ссылающихся на него PassImage"""
+    name = models.CharField(max_length=255, unique=True, verbose_name="Путь")
+    sha256 = models.CharField(max_length=64, verbose_name="SHA-256")
+    size = models.BigIntegerField(verbose_name="Размер")
+    ref_count = models.IntegerField(default=0, verbose_name="Ссылок")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Последнее использование")
+
+    class Meta:
+        verbose_name = "Файл изображения"
+        verbose_name_plural = "Файлы изображений"
+        indexes = [
+            models.Index(fields=['ref_count', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count})"
+
+
+
+class UploadSession(models.Model):
+    """Сессия возобновляемой загрузки изображения по частям"""
+    STATUS_CHOICES = [
+        ('active', 'Загружается'),
+        ('completed', 'Завершена'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    mountain_pass = models.ForeignKey(
+        MountainPass,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+        verbose_name="Перевал"
+    )
+    title = models.CharField(max_length=255, verbose_name="Название")
+    filename = models.CharField(max_length=255, verbose_name="Имя файла")
+    size = models.BigIntegerField(verbose_name="Размер")
+    offset = models.BigIntegerField(default=0, verbose_name="Получено байт")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='active', verbose_name="Статус")
+    image = models.OneToOneField(
+        PassImage,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload_session',
+        verbose_name="Изображение"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Последняя часть")
+
+    class Meta:
+        verbose_name = "Сессия загрузки"
+        verbose_name_plural = "Сессии загрузки"
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.filename}: {self.offset}/{self.size}"
+
+    @property
+    def part_path(self):
+        """Файл с уже полученными байтами"""
+        return Path(settings.MEDIA_ROOT) / 'partial_uploads' / f"{self.pk}.part"
+
+    def is_complete(self):
+        return self.offset == self.size
+
+
+
+class Job(models.Model):
+    """Фоновая задача в очереди, хранящейся в таблице БД"""
+    STATUS_CHOICES = [
+        ('queued', 'В очереди'),
+        ('running', 'Выполняется'),
+        ('dead', 'Отброшена'),
+    ]
+
+    task = models.CharField(max_length=100, verbose_name="Задача")
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Параметры")
+    queue = models.CharField(max_length=50, default='default', verbose_name="Очередь")
+    priority = models.SmallIntegerField(default=0, verbose_name="Приоритет")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued', verbose_name="Статус")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Попыток")
+    max_attempts = models.PositiveSmallIntegerField(default=5, verbose_name="Максимум попыток")
+    run_at = models.DateTimeField(default=timezone.now, verbose_name="Выполнить не раньше")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="Взята в работу")
+    locked_by = models.CharField(max_length=100, blank=True, default='', verbose_name="Обработчик")
+    last_error = models.TextField(blank=True, default='', verbose_name="Последняя ошибка")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+
+    class Meta:
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        indexes = [
+            # Выборка готовых задач: только строки в очереди, по приоритету и времени
+            models.Index(
+                fields=['queue', '-priority', 'run_at'],
+                name='passes_job_ready_idx',
+                condition=models.Q(status='queued')
+            ),
+            models.Index(fields=['status', 'locked_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.get_status_display()})"
+
+
+class NotificationOutbox(models.Model):
+    """
+    Уведомление туриста о событии с его перевалом. Запись создаётся в одной
+    транзакции со сменой статуса, доставкой занимается фоновая задача.
+    """
+    CHANNEL_CHOICES = [
+        ('email', 'Email'),
+        ('webhook', 'Webhook'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Ожидает отправки'),
+        ('sent', 'Отправлено'),
+        ('failed', 'Не доставлено'),
+    ]
+
+    event = models.CharField(max_length=50, verbose_name="Событие")
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES, verbose_name="Канал")
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name="Пользователь"
+    )
+    mountain_pass = models.ForeignKey(
+        MountainPass,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name="Перевал"
+    )
+    payload = models.JSONField(default=dict, verbose_name="Данные")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name="Статус")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Попыток")
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="Следующая попытка")
+    last_error = models.TextField(blank=True, default='', verbose_name="Последняя ошибка")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Дата отправки")
+
+    class Meta:
+        verbose_name = "Уведомление"
+        verbose_name_plural = "Уведомления"
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                name='passes_outbox_pending_idx',
+                condition=models.Q(status='pending')
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event} -> {self.user_id} ({self.channel})"
+
+
+class PassStatusHistory(models.Model):
+    """
+    Журнал смен статуса перевалов, только добавление. Ссылка на перевал
+    без внешнего ключа в БД, чтобы история переживала удаление перевала.
+    """
+    mountain_pass = models.ForeignKey(
+        MountainPass,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='status_history',
+        verbose_name="Перевал"
+    )
+    from_status = models.CharField(max_length=10, choices=MountainPass.STATUS_CHOICES, verbose_name="Был статус")
+    to_status = models.CharField(max_length=10, choices=MountainPass.STATUS_CHOICES, verbose_name="Стал статус")
+    actor = models.CharField(max_length=150, blank=True, default='', verbose_name="Кто изменил")
+    changed_at = models.DateTimeField(default=timezone.now, verbose_name="Время изменения")
+
+    class Meta:
+        verbose_name = "Смена статуса"
+        verbose_name_plural = "История статусов"
+        ordering = ['changed_at', 'pk']
+        indexes = [
+            models.Index(fields=['mountain_pass', 'changed_at'], name='passes_history_pass_idx'),
+            models.Index(fields=['changed_at', 'to_status'], name='passes_history_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.mountain_pass_id}: {self.from_status} -> {self.to_status}"
+
+
+class PassStatsRollup(models.Model):
+    """
+    Предрасчитанный счётчик статистики: число перевалов в корзине метрики
+    (статус, уровень по сезону, диапазон высоты, день добавления)
+    """
+    metric = models.CharField(max_length=20, verbose_name="Метрика")
+    bucket = models.CharField(max_length=20, verbose_name="Значение")
+    count = models.BigIntegerField(default=0, verbose_name="Количество")
+
+    class Meta:
+        verbose_name = "Счётчик статистики"
+        verbose_name_plural = "Статистика"
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'bucket'], name='passes_stats_metric_bucket_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.metric}={self.bucket}: {self.count}"
+
+
+class UserPassStats(models.Model):
+    """Счётчики перевалов пользователя: всего и по статусам"""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='pass_stats',
+        verbose_name="Пользователь"
+    )
+    total = models.IntegerField(default=0, verbose_name="Всего")
+    new = models.IntegerField(default=0, verbose_name="Новых")
+    pending = models.IntegerField(default=0, verbose_name="На модерации")
+    accepted = models.IntegerField(default=0, verbose_name="Принято")
+    rejected = models.IntegerField(default=0, verbose_name="Отклонено")
+
+    COUNTER_FIELDS = ('total', 'new', 'pending', 'accepted', 'rejected')
+
+    class Meta:
+        verbose_name = "Счётчики пользователя"
+        verbose_name_plural = "Счётчики пользователей"
+
+    def __str__(self):
+        return f"{self.user_id}: {self.total}"
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.COUNTER_FIELDS}
+
+
+class ArchivedPass(models.Model):
+    """
+    Завершённый (принятый или отклонённый) перевал, перенесённый из рабочей
+    таблицы командой archive_passes. Координаты и уровень хранятся в той же
+    строке; id совпадает с id исходного перевала.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    beauty_title = models.CharField(max_length=255, verbose_name="Тип объекта")
+    title = models.CharField(max_length=255, verbose_name="Название")
+    other_titles = models.CharField(max_length=255, blank=True, null=True, verbose_name="Другое название")
+    connect = models.TextField(blank=True, null=True, verbose_name="Соединяет")
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_passes',
+        verbose_name="Пользователь"
+    )
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, verbose_name="Широта")
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, verbose_name="Долгота")
+    height = models.IntegerField(verbose_name="Высота")
+    winter = models.CharField(max_length=2, choices=Level.LEVEL_CHOICES, blank=True, null=True, verbose_name="Зима")
+    summer = models.CharField(max_length=2, choices=Level.LEVEL_CHOICES, blank=True, null=True, verbose_name="Лето")
+    autumn = models.CharField(max_length=2, choices=Level.LEVEL_CHOICES, blank=True, null=True, verbose_name="Осень")
+    spring = models.CharField(max_length=2, choices=Level.LEVEL_CHOICES, blank=True, null=True, verbose_name="Весна")
+    add_time = models.DateTimeField(verbose_name="Время добавления")
+    update_time = models.DateTimeField(verbose_name="Время обновления")
+    status = models.CharField(max_length=10, choices=MountainPass.STATUS_CHOICES, verbose_name="Статус")
+    version = models.PositiveIntegerField(default=1, verbose_name="Версия")
+    archived_at = models.DateTimeField(default=timezone.now, verbose_name="Время архивации")
+
+    class Meta:
+        verbose_name = "Архивный перевал"
+        verbose_name_plural = "Архив перевалов"
+        ordering = ['-add_time']
+        indexes = [
+            models.Index(fields=['user', 'add_time'], name='passes_archive_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.get_status_display()}, архив)"
+
+    # Те же атрибуты, что у MountainPass, чтобы подходили его сериализаторы
+    @property
+    def coords(self):
+        return Coords(latitude=self.latitude, longitude=self.longitude, height=self.height)
+
+    @property
+    def level(self):
+        return Level(winter=self.winter, summer=self.summer, autumn=self.autumn, spring=self.spring)
+
+    @property
+    def etag(self):
+        return f'"{self.version}"'
+
+    def can_be_edited(self):
+        return False
+
+
+class ArchivedPassImage(models.Model):
+    """Изображение архивного перевала; файл в хранилище остаётся тем же"""
+    id = models.BigIntegerField(primary_key=True)
+    mountain_pass = models.ForeignKey(
+        ArchivedPass,
+        on_delete=models.CASCADE,
+        related_name='images',
+        verbose_name="Перевал"
+    )
+    title = models.CharField(max_length=255, verbose_name="Название")
+    image = models.ImageField(storage=pass_image_storage, verbose_name="Изображение")
+    sha256 = models.CharField(max_length=64, blank=True, default='', verbose_name="SHA-256")
+    phash = models.CharField(max_length=16, blank=True, default='', verbose_name="pHash")
+    dhash = models.CharField(max_length=16, blank=True, default='', verbose_name="dHash")
+    created_at = models.DateTimeField(verbose_name="Дата создания")
+
+    class Meta:
+        verbose_name = "Изображение архивного перевала"
+        verbose_name_plural = "Изображения архивных перевалов"
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['mountain_pass', 'created_at'], name='passes_archive_image_pass_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.title} - {self.mountain_pass.title}"
\ No newline at end of file
+        return f"{self.title} - {self.mountain_pass_id}"
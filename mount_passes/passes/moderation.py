@@ -0,0 +1,35 @@
+"""Смена статуса перевалов вне API: админка, массовые операции"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import MountainPass
+from .signals import StatusChange, pass_status_changed
+
+
+@transaction.atomic
+def change_status(queryset, new_status, actor=''):
+    """
+    Переводит перевалы queryset в new_status одним UPDATE и отправляет
+    один сигнал pass_status_changed на все изменения. Возвращает их число.
+    """
+    rows = list(
+        queryset.exclude(status=new_status)
+        .select_for_update()
+        .order_by()
+        .values_list('pk', 'user_id', 'status')
+    )
+    if not rows:
+        return 0
+
+    MountainPass.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(
+        status=new_status,
+        update_time=timezone.now(),
+        version=F('version') + 1
+    )
+    pass_status_changed.send(
+        sender=MountainPass,
+        changes=[StatusChange(pk, user_id, old_status, new_status) for pk, user_id, old_status in rows],
+        actor=actor
+    )
+    return len(rows)
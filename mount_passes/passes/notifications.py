@@ -0,0 +1,261 @@
+"""Уведомления туристов о смене статуса перевалов: email и webhook"""
+import hashlib
+import hmac
+import json
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from http.client import HTTPConnection, HTTPSConnection
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .jobs import enqueue, retry_delay
+from .models import Job, MountainPass, NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_TASK = 'passes.dispatch_notifications'
+
+
+def _channels():
+    channels = ['email']
+    if settings.PASS_NOTIFICATION_WEBHOOK_URLS:
+        channels.append('webhook')
+    return channels
+
+
+def schedule_dispatch(delay):
+    """
+    Одна задача рассылки на всех: события за delay секунд объединяются.
+    Задача, запланированная позже (повтор через час), не подходит:
+    новое событие ждало бы её.
+    """
+    run_before = timezone.now() + timedelta(seconds=delay)
+    if not Job.objects.filter(task=DISPATCH_TASK, status='queued', run_at__lte=run_before).exists():
+        enqueue(DISPATCH_TASK, delay=delay, priority=1)
+
+
+def record_status_changes(changes):
+    """Записывает события в outbox в текущей транзакции"""
+    changes = [change for change in changes if change.new_status in settings.PASS_NOTIFY_STATUSES]
+    if not changes:
+        return
+
+    titles = dict(
+        MountainPass.objects.filter(pk__in=[change.pass_id for change in changes]).values_list('pk', 'title')
+    )
+    status_names = dict(MountainPass.STATUS_CHOICES)
+    rows = [
+        NotificationOutbox(
+            event='status_changed',
+            channel=channel,
+            user_id=change.user_id,
+            mountain_pass_id=change.pass_id,
+            payload={
+                'id': change.pass_id,
+                'title': titles.get(change.pass_id, ''),
+                'old_status': change.old_status,
+                'status': change.new_status,
+                'status_display': status_names[change.new_status],
+            },
+        )
+        for change in changes
+        for channel in _channels()
+    ]
+    NotificationOutbox.objects.bulk_create(rows)
+    schedule_dispatch(settings.PASS_NOTIFICATION_COALESCE_SECONDS)
+
+
+def _email_message(user, events):
+    lines = [f"«{event['title']}»: {event['status_display']}" for event in events]
+    subject = (
+        "Статус перевала изменён" if len(events) == 1
+        else f"Изменён статус перевалов: {len(events)}"
+    )
+    body = "\n".join([f"Здравствуйте, {user.name}!", "", *lines, "", "ФСТР"])
+    return EmailMessage(subject, body, settings.PASS_NOTIFICATION_FROM_EMAIL, [user.email])
+
+
+def _deliver_email(groups):
+    """Одно письмо на пользователя, все письма через одно SMTP-соединение"""
+    delivered, failed = [], {}
+    messages = [(rows, _email_message(rows[0].user, [row.payload for row in rows])) for rows in groups]
+    mail_connection = get_connection(fail_silently=False)
+    try:
+        mail_connection.open()
+        for rows, message in messages:
+            try:
+                mail_connection.send_messages([message])
+                delivered.extend(rows)
+            except Exception as e:
+                failed.update({row.pk: str(e) for row in rows})
+    except Exception as e:
+        failed.update({row.pk: str(e) for rows, _ in messages for row in rows})
+    finally:
+        mail_connection.close()
+    return delivered, failed
+
+
+class WebhookPool:
+    """Keep-alive соединения по хостам, переиспользуемые в пределах рассылки"""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.connections = {}
+
+    def post(self, url, body, headers):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        for attempt in range(2):
+            conn = self.connections.get(key)
+            if conn is None:
+                conn_class = HTTPSConnection if parts.scheme == 'https' else HTTPConnection
+                conn = self.connections[key] = conn_class(parts.netloc, timeout=self.timeout)
+            try:
+                path = parts.path or '/'
+                if parts.query:
+                    path = f"{path}?{parts.query}"
+                conn.request('POST', path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                return response.status
+            except (ConnectionError, OSError):
+                # Сервер закрыл keep-alive соединение: одна повторная попытка с новым
+                conn.close()
+                del self.connections[key]
+                if attempt:
+                    raise
+
+    def close(self):
+        for conn in self.connections.values():
+            conn.close()
+
+
+def _deliver_webhooks(groups):
+    """Один POST на пользователя с пачкой событий на каждый адрес"""
+    delivered, failed = [], {}
+    pool = WebhookPool(settings.PASS_NOTIFICATION_WEBHOOK_TIMEOUT)
+    try:
+        for rows in groups:
+            body = json.dumps({
+                'email': rows[0].user.email,
+                'events': [row.payload for row in rows],
+            }, ensure_ascii=False).encode()
+            headers = {'Content-Type': 'application/json'}
+            if settings.PASS_NOTIFICATION_WEBHOOK_SECRET:
+                headers['X-Passes-Signature'] = hmac.new(
+                    settings.PASS_NOTIFICATION_WEBHOOK_SECRET.encode(), body, hashlib.sha256
+                ).hexdigest()
+            try:
+                for url in settings.PASS_NOTIFICATION_WEBHOOK_URLS:
+                    response_status = pool.post(url, body, headers)
+                    if response_status >= 300:
+                        raise ConnectionError(f"{url} ответил {response_status}")
+                delivered.extend(rows)
+            except Exception as e:
+                failed.update({row.pk: str(e) for row in rows})
+    finally:
+        pool.close()
+    return delivered, failed
+
+
+DELIVERY = {
+    'email': _deliver_email,
+    'webhook': _deliver_webhooks,
+}
+
+
+def claim_pending(batch_size, now):
+    """
+    Забирает пачку уведомлений в короткой транзакции: next_attempt_at
+    сдвигается на PASS_NOTIFICATION_CLAIM_TIMEOUT, и другие рассыльщики
+    их не видят. Если процесс упадёт во время отправки, записи вернутся
+    в рассылку после этого срока.
+    """
+    claimed_until = now + timedelta(seconds=settings.PASS_NOTIFICATION_CLAIM_TIMEOUT)
+    with transaction.atomic():
+        pending = (
+            NotificationOutbox.objects.filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'pk')
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        ids = list(pending.values_list('pk', flat=True)[:batch_size])
+        NotificationOutbox.objects.filter(pk__in=ids).update(
+            next_attempt_at=claimed_until, attempts=F('attempts') + 1
+        )
+    rows = list(
+        NotificationOutbox.objects.filter(pk__in=ids, next_attempt_at=claimed_until)
+        .select_related('user')
+        .order_by('pk')
+    )
+    return rows, claimed_until
+
+
+def dispatch_pending(batch_size=None):
+    """
+    Отправляет накопившиеся уведомления. События одного пользователя
+    в одном канале объединяются в одно сообщение. Записи забираются
+    и фиксируются до отправки, поэтому блокировки и транзакция не
+    держатся во время обращений к SMTP и webhook. Возвращает пару
+    (доставлено, выбрано) записей.
+    """
+    batch_size = batch_size or settings.PASS_NOTIFICATION_BATCH_SIZE
+    now = timezone.now()
+    rows, claimed_until = claim_pending(batch_size, now)
+
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[(row.channel, row.user_id)].append(row)
+    by_channel = defaultdict(list)
+    for (channel, _), group in grouped.items():
+        by_channel[channel].append(group)
+
+    delivered, failed = [], {}
+    for channel, groups in by_channel.items():
+        channel_delivered, channel_failed = DELIVERY[channel](groups)
+        delivered.extend(channel_delivered)
+        failed.update(channel_failed)
+
+    # Результат записывается, только пока записи числятся за этой рассылкой
+    finished_at = timezone.now()
+    claimed = NotificationOutbox.objects.filter(status='pending', next_attempt_at=claimed_until)
+    with transaction.atomic():
+        claimed.filter(pk__in=[row.pk for row in delivered]).update(status='sent', sent_at=finished_at)
+        for row in rows:
+            if row.pk not in failed:
+                continue
+            row.last_error = failed[row.pk]
+            if row.attempts >= settings.PASS_NOTIFICATION_MAX_ATTEMPTS:
+                row.status = 'failed'
+                logger.error("Уведомление %s не доставлено: %s", row.pk, row.last_error)
+            else:
+                row.next_attempt_at = finished_at + timedelta(seconds=retry_delay(row.attempts))
+        claimed.bulk_update(
+            [row for row in rows if row.pk in failed], ['last_error', 'status', 'next_attempt_at']
+        )
+    return len(delivered), len(rows)
+
+
+def dispatch_notifications():
+    """Фоновая рассылка: обрабатывает пачки, пока есть готовые уведомления"""
+    while True:
+        _, claimed = dispatch_pending()
+        if claimed < settings.PASS_NOTIFICATION_BATCH_SIZE:
+            break
+
+    # Отложенные повторы: задача планирует себя на ближайшую попытку
+    next_attempt = (
+        NotificationOutbox.objects.filter(status='pending')
+        .order_by('next_attempt_at')
+        .values_list('next_attempt_at', flat=True)
+        .first()
+    )
+    if next_attempt is not None:
+        delay = max((next_attempt - timezone.now()).total_seconds(), 0)
+        enqueue(DISPATCH_TASK, delay=delay, priority=1)
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+
+
+class KnownCountPagination(PageNumberPagination):
+    """
+    Постраничный вывод с заранее известным числом записей: вместо
+    SELECT COUNT(*) используется значение known_count (например, счётчик).
+    """
+    known_count = None
+
+    def django_paginator_class(self, object_list, per_page):
+        paginator = Paginator(object_list, per_page)
+        if self.known_count is not None:
+            paginator.count = self.known_count
+        return paginator
+
+
+def table_estimate(model, using):
+    """Оценка числа строк таблицы из статистики PostgreSQL или None"""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+        row = cursor.fetchone()
+    # -1: таблицу ещё не анализировали
+    return row[0] if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator для админки без точного COUNT(*) по большой таблице: без
+    фильтров берётся оценка PostgreSQL, если она больше PASS_ADMIN_COUNT_LIMIT;
+    выборка с фильтром или поиском считается не дальше этого предела.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, 'query'):
+            return super().count
+        limit = settings.PASS_ADMIN_COUNT_LIMIT
+        if not queryset.query.where:
+            estimate = table_estimate(queryset.model, queryset.db)
+            if estimate is not None and estimate > limit:
+                return estimate
+        return queryset.order_by()[:limit].count()
@@ -0,0 +1,101 @@
+"""Проверка планов запросов: полный просмотр или сортировка больших таблиц без индекса"""
+import json
+import re
+
+from django.apps import apps
+from django.db import connections
+
+# Таблицы, которые растут вместе с числом перевалов
+LARGE_MODELS = (
+    'MountainPass', 'PassImage', 'ArchivedPass', 'ArchivedPassImage',
+    'PassStatusHistory', 'NotificationOutbox', 'Job', 'User',
+)
+
+SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+SQLITE_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+SQLITE_ACCESS = re.compile(r'^(?:SCAN|SEARCH) ')
+SQLITE_ROWID = re.compile(r'^SEARCH .* USING INTEGER PRIMARY KEY \(rowid=\?\)$')
+
+
+def large_tables():
+    return {apps.get_model('passes', name)._meta.db_table for name in LARGE_MODELS}
+
+
+def needs_index(sql):
+    """Запросы с условием или сортировкой; COUNT(*) всей таблицы индекс не ускорит"""
+    sql = sql.lstrip().upper()
+    return sql.startswith('SELECT') and (' WHERE ' in sql or ' ORDER BY ' in sql)
+
+
+def _sqlite_problems(connection, sql, tables):
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        details = [row[-1] for row in cursor.fetchall()]
+    # Внешний цикл по первичному ключу даёт не больше одной строки, её сортировка бесплатна
+    access = [detail for detail in details if SQLITE_ACCESS.match(detail)]
+    single_row = bool(access) and SQLITE_ROWID.match(access[0]) is not None
+    problems = []
+    for detail in details:
+        scan = SQLITE_SCAN.match(detail)
+        if scan and scan.group(1) in tables:
+            problems.append(f"полный просмотр {scan.group(1)}")
+        elif detail == SQLITE_SORT and not single_row:
+            problems.append("сортировка без индекса")
+    return problems, details
+
+
+def _postgresql_nodes(node):
+    yield node
+    for child in node.get('Plans', ()):
+        yield from _postgresql_nodes(child)
+
+
+def _postgresql_problems(connection, sql, tables):
+    # На небольшой тестовой базе планировщик предпочёл бы Seq Scan даже при
+    # подходящем индексе; с отключёнными seqscan/sort они остаются в плане,
+    # только если индекса нет
+    with connection.cursor() as cursor:
+        cursor.execute("SET enable_seqscan = off")
+        cursor.execute("SET enable_sort = off")
+        try:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+            plan = cursor.fetchone()[0]
+        finally:
+            cursor.execute("RESET enable_seqscan")
+            cursor.execute("RESET enable_sort")
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    problems = []
+    for node in _postgresql_nodes(plan[0]['Plan']):
+        if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in tables:
+            problems.append(f"полный просмотр {node['Relation Name']}")
+        elif node['Node Type'] == 'Sort' and node.get('Plan Rows', 0) > 1:
+            problems.append("сортировка без индекса")
+    return problems, plan
+
+
+def plan_problems(sql, using='default'):
+    """
+    Проблемы плана запроса и сам план. Поддерживаются SQLite (EXPLAIN QUERY PLAN)
+    и PostgreSQL (EXPLAIN FORMAT JSON), для других СУБД проверка пропускается.
+    """
+    connection = connections[using]
+    tables = large_tables()
+    if connection.vendor == 'sqlite':
+        return _sqlite_problems(connection, sql, tables)
+    if connection.vendor == 'postgresql':
+        return _postgresql_problems(connection, sql, tables)
+    return [], None
+
+
+def check_queries(captured, using='default'):
+    """{sql: проблемы} для запросов из CaptureQueriesContext, которым нужен индекс"""
+    result = {}
+    for query in captured:
+        sql = query['sql']
+        if not needs_index(sql):
+            continue
+        problems, _ = plan_problems(sql, using)
+        if problems:
+            result[sql] = problems
+    return result
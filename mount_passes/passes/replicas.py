@@ -0,0 +1,159 @@
+"""Чтение с реплик БД: роутер, исключение отстающих реплик, «липкий» primary после записи"""
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+# Алиас БД для чтения в текущем запросе; None - primary
+read_alias = ContextVar('passes_read_alias', default=None)
+
+# Отставание реплики (сек) по времени последней применённой транзакции.
+# Если всё полученное уже применено, реплика не отстаёт, даже когда
+# на primary давно не было записей. Но receive_lsn = replay_lsn и у реплики,
+# чей WAL receiver остановлен или не может подключиться к primary: без
+# потоковой репликации результат NULL. Роль без pg_read_all_stats видит
+# в pg_stat_wal_receiver только pid, тогда достаточно наличия процесса
+PG_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver WHERE COALESCE(status, 'streaming') = 'streaming'
+        ) THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def measure_lag(alias):
+    """
+    Отставание реплики в секундах; None, если реплика не получает WAL
+    от primary. Для не-PostgreSQL считается нулевым
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(PG_LAG_SQL)
+        lag = cursor.fetchone()[0]
+    return None if lag is None else float(lag)
+
+
+class ReplicaSet:
+    """
+    Реплики из PASS_READ_REPLICAS, отставание которых не больше
+    PASS_REPLICA_MAX_LAG. Отставание перепроверяется не чаще раза
+    в PASS_REPLICA_LAG_CHECK_INTERVAL секунд; проверку выполняет один
+    запрос, остальные пользуются прошлым результатом.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.healthy = []
+        self.checked_at = None
+        self.aliases = ()
+
+    def refresh(self):
+        healthy = []
+        for alias in self.aliases:
+            try:
+                lag = measure_lag(alias)
+            except Exception as e:
+                logger.warning("Реплика %s недоступна: %s", alias, e)
+                continue
+            if lag is None:
+                logger.warning("Реплика %s не получает WAL от primary, исключена", alias)
+                continue
+            if lag > settings.PASS_REPLICA_MAX_LAG:
+                logger.warning("Реплика %s отстаёт на %.1f сек, исключена", alias, lag)
+                continue
+            healthy.append(alias)
+        self.healthy = healthy
+
+    def available(self):
+        aliases = tuple(settings.PASS_READ_REPLICAS)
+        now = time.monotonic()
+        if aliases != self.aliases or self.checked_at is None \
+                or now - self.checked_at >= settings.PASS_REPLICA_LAG_CHECK_INTERVAL:
+            if self.lock.acquire(blocking=False):
+                try:
+                    self.aliases = aliases
+                    self.refresh()
+                    self.checked_at = now
+                finally:
+                    self.lock.release()
+        return self.healthy
+
+    def choose(self):
+        """Случайная реплика из допустимых или None, если читать нужно с primary"""
+        healthy = self.available()
+        return random.choice(healthy) if healthy else None
+
+    def reset(self):
+        self.healthy, self.checked_at, self.aliases = [], None, ()
+
+
+replica_set = ReplicaSet()
+
+
+class ReplicaRouter:
+    """Запись и миграции - только primary; чтение - реплика, выбранная представлением"""
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что и на primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.PASS_READ_REPLICAS
+
+
+class ReplicaReadMixin:
+    """
+    Безопасные запросы представления читают с реплики (для ViewSet -
+    только действия из replica_actions). После успешной записи клиент
+    получает cookie PASS_REPLICA_STICKY_COOKIE и следующие
+    PASS_REPLICA_STICKY_SECONDS секунд читает с primary свои изменения.
+    Действия из read_actions только читают, даже если вызваны через POST.
+    """
+    replica_actions = None
+    read_actions = ()
+
+    def is_read(self, request):
+        return request.method in SAFE_METHODS or getattr(self, 'action', None) in self.read_actions
+
+    def use_replica(self, request):
+        if not self.is_read(request):
+            return False
+        if self.replica_actions is not None and getattr(self, 'action', None) not in self.replica_actions:
+            return False
+        return settings.PASS_REPLICA_STICKY_COOKIE not in request.COOKIES
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if settings.PASS_READ_REPLICAS and self.use_replica(request):
+            self._read_alias_token = read_alias.set(replica_set.choose())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_read_alias_token', None)
+        if token is not None:
+            read_alias.reset(token)
+            self._read_alias_token = None
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if settings.PASS_READ_REPLICAS and not self.is_read(request) and response.status_code < 400:
+            response.set_cookie(
+                settings.PASS_REPLICA_STICKY_COOKIE, '1',
+                max_age=settings.PASS_REPLICA_STICKY_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,120 @@
+"""
+Схема OpenAPI, сгенерированная один раз на версию кода. drf_yasg
+импортируется только при генерации и показе документации.
+"""
+import hashlib
+import os
+import threading
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+
+from django.conf import settings
+
+API_INFO = {
+    'title': "Mountain Passes API",
+    'default_version': 'v1',
+    'description': "API для сбора и модерации данных о горных перевалах",
+    'terms_of_service': "https://www.google.com/policies/terms/",
+    'contact': {'email': "contact@example.com"},
+    'license': {'name': "MIT License"},
+}
+FORMATS = {
+    '.json': 'application/json; charset=utf-8',
+    '.yaml': 'application/yaml; charset=utf-8',
+}
+# Модули, не влияющие на схему
+SKIPPED_SOURCES = {'tests.py'}
+SKIPPED_DIRS = {'migrations', 'management', '__pycache__'}
+
+_lock = threading.Lock()
+_documents = {}
+
+
+@lru_cache(maxsize=1)
+def schema_version():
+    """
+    Отпечаток кода, от которого зависит схема: исходники приложения,
+    настройки и версии DRF/drf_yasg. Меняется только вместе с кодом.
+    """
+    digest = hashlib.sha256()
+    app_dir = Path(__file__).resolve().parent
+    sources = [
+        path for path in sorted(app_dir.rglob('*.py'))
+        if path.name not in SKIPPED_SOURCES and not SKIPPED_DIRS & set(path.relative_to(app_dir).parts)
+    ]
+    sources.append(Path(settings.BASE_DIR) / 'mount_passes' / 'settings.py')
+    for path in sources:
+        if path.exists():
+            digest.update(path.read_bytes())
+    for package in ('djangorestframework', 'drf-yasg'):
+        try:
+            digest.update(metadata.version(package).encode())
+        except metadata.PackageNotFoundError:
+            pass
+    return digest.hexdigest()[:16]
+
+
+def schema_path(fmt, version=None):
+    return Path(settings.PASS_SCHEMA_DIR) / f"openapi-{version or schema_version()}{fmt}"
+
+
+def api_info():
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        **{key: value for key, value in API_INFO.items() if key not in ('contact', 'license')},
+        contact=openapi.Contact(**API_INFO['contact']),
+        license=openapi.License(**API_INFO['license']),
+    )
+
+
+def generate_schema():
+    """Строит схему по всем эндпоинтам и записывает её в файлы текущей версии"""
+    from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    schema = OpenAPISchemaGenerator(api_info()).get_schema(request=None, public=True)
+    paths = {}
+    for fmt, codec in (('.json', OpenAPICodecJson), ('.yaml', OpenAPICodecYaml)):
+        path = schema_path(fmt)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Запись через временный файл: параллельный читатель не увидит половину схемы
+        tmp = path.with_name(f".{path.name}.{os.getpid()}")
+        tmp.write_bytes(codec(validators=[]).encode(schema))
+        os.replace(tmp, path)
+        paths[fmt] = path
+    return paths
+
+
+def get_document(fmt):
+    """(содержимое, ETag) схемы текущей версии; файл создаётся при первом обращении"""
+    document = _documents.get(fmt)
+    if document is not None:
+        return document
+    with _lock:
+        if fmt not in _documents:
+            path = schema_path(fmt)
+            if not path.exists():
+                generate_schema()
+            body = path.read_bytes()
+            _documents[fmt] = (body, f'"{schema_version()}-{hashlib.sha256(body).hexdigest()[:16]}"')
+        return _documents[fmt]
+
+
+def clear_cache():
+    _documents.clear()
+    schema_version.cache_clear()
+
+
+def render_docs_page(request, ui):
+    """
+    Страница Swagger UI или ReDoc. Для неё нужны только заголовок и версия,
+    саму схему браузер загружает по SPEC_URL из заранее сгенерированного файла.
+    """
+    from drf_yasg import openapi
+    from drf_yasg.renderers import ReDocRenderer, SwaggerUIRenderer
+
+    renderer = {'swagger': SwaggerUIRenderer, 'redoc': ReDocRenderer}[ui]()
+    document = openapi.Swagger(info=api_info(), _prefix='/', paths=openapi.Paths(paths={}))
+    return renderer.render(document, renderer.media_type, {'request': request})
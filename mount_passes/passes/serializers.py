@@ -1,6 +1,14 @@
+import os
 import re
+import uuid
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
-from .models import User, Coords, Level, MountainPass, PassImage
+from .exceptions import EditConflict
+from .models import User, Coords, Level, MountainPass, PassImage, PassStatusHistory, UploadSession
+from .signals import StatusChange, images_created, pass_status_changed
+from .storage import pass_image_storage, register_blob
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -78,7 +86,7 @@ class LevelSerializer(serializers.ModelSerializer):
 class PassImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = PassImage
-        fields = ['title', 'image']
+        fields = ['id', 'title', 'image']
 
 
 class PassImageCreateSerializer(serializers.ModelSerializer):
@@ -89,7 +97,135 @@ class PassImageCreateSerializer(serializers.ModelSerializer):
         fields = ['title', 'image']
 
 
-class MountainPassSerializer(serializers.ModelSerializer):
+class PassImageUpdateSerializer(serializers.ModelSerializer):
+    """
+    Изображение при редактировании: с id - оставить (и при необходимости
+    переименовать), без id - добавить новое.
+    """
+    id = serializers.IntegerField(required=False)
+
+    class Meta:
+        model = PassImage
+        fields = ['id', 'title', 'image']
+        extra_kwargs = {
+            'title': {'required': False},
+            'image': {'required': False},
+        }
+
+    def validate(self, data):
+        if 'id' not in data and ('title' not in data or 'image' not in data):
+            raise serializers.ValidationError("Для нового изображения нужны title и image")
+        if 'id' in data and 'image' in data:
+            raise serializers.ValidationError("Файл существующего изображения заменить нельзя")
+        return data
+
+
+class UploadedImageSerializer(serializers.Serializer):
+    """Изображение, загруженное клиентом напрямую в объектное хранилище"""
+    title = serializers.CharField(max_length=255)
+    key = serializers.CharField(max_length=255)
+
+    def validate_key(self, value):
+        storage = pass_image_storage()
+        if not hasattr(storage, 'head'):
+            raise serializers.ValidationError("Прямая загрузка изображений не настроена")
+        if not value.startswith(f"{settings.PASS_UPLOAD_PREFIX}/") or '..' in value:
+            raise serializers.ValidationError("Некорректный ключ объекта")
+        return value
+
+    def validate(self, attrs):
+        meta = pass_image_storage().head(attrs['key'])
+        if meta is None:
+            raise serializers.ValidationError({'key': "Объект не найден в хранилище"})
+        if meta['size'] > settings.PASS_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError({'key': "Файл слишком большой"})
+        if not meta['content_type'].startswith('image/'):
+            raise serializers.ValidationError({'key': "Файл не является изображением"})
+        attrs['size'] = meta['size']
+        return attrs
+
+
+def confirm_uploaded_images(uploaded_images):
+    """
+    Подтверждённые объекты получают запись ImageBlob до создания PassImage,
+    чтобы их учитывали счётчики ссылок и collect_image_blobs. SHA-256
+    дописывает фоновый расчёт хэшей.
+    """
+    for uploaded in uploaded_images:
+        register_blob(uploaded['key'], '', uploaded['size'])
+    return uploaded_images
+
+
+class UploadSlotFileSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+    content_type = serializers.ChoiceField(choices=['image/jpeg', 'image/png', 'image/webp'])
+
+
+class UploadSlotRequestSerializer(serializers.Serializer):
+    """Запрос подписанных URL для прямой загрузки изображений"""
+    files = UploadSlotFileSerializer(many=True, allow_empty=False)
+
+    def validate_files(self, value):
+        if len(value) > settings.PASS_UPLOAD_MAX_SLOTS:
+            raise serializers.ValidationError(
+                f"Не более {settings.PASS_UPLOAD_MAX_SLOTS} файлов за один запрос"
+            )
+        return value
+
+    def create_slots(self):
+        storage = pass_image_storage()
+        day = timezone.now().strftime('%Y/%m/%d')
+        slots = []
+        for file in self.validated_data['files']:
+            extension = os.path.splitext(file['filename'])[1].lower()
+            if extension not in ('.jpg', '.jpeg', '.png', '.webp'):
+                extension = ''
+            key = f"{settings.PASS_UPLOAD_PREFIX}/{day}/{uuid.uuid4().hex}{extension}"
+            slots.append({
+                'filename': file['filename'],
+                'key': key,
+                'method': 'PUT',
+                'url': storage.presigned_url('PUT', key, expires=settings.PASS_UPLOAD_SLOT_TTL),
+                'headers': {'Content-Type': file['content_type']},
+                'expires_in': settings.PASS_UPLOAD_SLOT_TTL,
+            })
+        return slots
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Сессия возобновляемой загрузки изображения"""
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'mountain_pass', 'title', 'filename', 'size', 'offset', 'status', 'image']
+        read_only_fields = ['id', 'offset', 'status', 'image']
+
+    def validate_mountain_pass(self, value):
+        if not value.can_be_edited():
+            raise serializers.ValidationError(
+                "Редактирование возможно только для записей со статусом 'new'"
+            )
+        return value
+
+    def validate_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Размер файла должен быть положительным")
+        if value > settings.PASS_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError("Файл слишком большой")
+        return value
+
+
+class SparseFieldsMixin:
+    """Оставляет в ответе только поля из аргумента fields (см. passes.fieldsets)"""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class MountainPassSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     coords = CoordsSerializer()
     level = LevelSerializer()
@@ -107,10 +243,11 @@ class MountainPassSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         """Кастомное представление для вывода"""
         representation = super().to_representation(instance)
-        representation['images'] = PassImageSerializer(
-            instance.images.all(),
-            many=True
-        ).data
+        if 'images' in self.fields:
+            representation['images'] = PassImageSerializer(
+                instance.images.all(),
+                many=True
+            ).data
         return representation
 
 
@@ -127,12 +264,13 @@ class MountainPassCreateSerializer(serializers.ModelSerializer):
     coords = CoordsSerializer()
     level = LevelSerializer()
     images = PassImageCreateSerializer(many=True, required=False)
+    uploaded_images = UploadedImageSerializer(many=True, required=False, write_only=True)
 
     class Meta:
         model = MountainPass
         fields = [
             'beauty_title', 'title', 'other_titles', 'connect',
-            'user', 'coords', 'level', 'images'
+            'user', 'coords', 'level', 'images', 'uploaded_images'
         ]
 
     def create(self, validated_data):
@@ -140,6 +278,7 @@ class MountainPassCreateSerializer(serializers.ModelSerializer):
         coords_data = validated_data.pop('coords')
         level_data = validated_data.pop('level')
         images_data = validated_data.pop('images', [])
+        uploaded_images = validated_data.pop('uploaded_images', [])
 
         user_serializer = UserCreateSerializer(data=user_data)
         user_serializer.is_valid(raise_exception=True)
@@ -162,6 +301,14 @@ class MountainPassCreateSerializer(serializers.ModelSerializer):
                 **image_data
             )
 
+        # Файл уже лежит в хранилище, сохраняется только ссылка на него
+        for uploaded in confirm_uploaded_images(uploaded_images):
+            PassImage.objects.create(
+                mountain_pass=mountain_pass,
+                title=uploaded['title'],
+                image=uploaded['key']
+            )
+
         return mountain_pass
 
 
@@ -169,15 +316,17 @@ class MountainPassUpdateSerializer(serializers.ModelSerializer):
     """Сериализатор для обновления перевала"""
     coords = CoordsSerializer(required=False)
     level = LevelSerializer(required=False)
-    images = PassImageCreateSerializer(many=True, required=False)
+    images = PassImageUpdateSerializer(many=True, required=False)
+    uploaded_images = UploadedImageSerializer(many=True, required=False, write_only=True)
 
     class Meta:
         model = MountainPass
         fields = [
             'beauty_title', 'title', 'other_titles', 'connect',
-            'coords', 'level', 'images'
+            'coords', 'level', 'images', 'uploaded_images'
         ]
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         if instance.status != 'new':
             raise serializers.ValidationError(
@@ -188,30 +337,82 @@ class MountainPassUpdateSerializer(serializers.ModelSerializer):
             if field in validated_data:
                 setattr(instance, field, validated_data[field])
 
+        related_changed = False
         if 'coords' in validated_data:
             coords_data = validated_data.pop('coords')
             for attr, value in coords_data.items():
                 setattr(instance.coords, attr, value)
+            related_changed |= bool(instance.coords.get_dirty_fields())
             instance.coords.save()
 
         if 'level' in validated_data:
             level_data = validated_data.pop('level')
             for attr, value in level_data.items():
                 setattr(instance.level, attr, value)
+            related_changed |= bool(instance.level.get_dirty_fields())
             instance.level.save()
 
+        new_images = [
+            PassImage(mountain_pass=instance, title=uploaded['title'], image=uploaded['key'])
+            for uploaded in confirm_uploaded_images(validated_data.pop('uploaded_images', []))
+        ]
         if 'images' in validated_data:
-            images_data = validated_data.pop('images')
-            instance.images.all().delete()
-            for image_data in images_data:
-                PassImage.objects.create(
-                    mountain_pass=instance,
-                    **image_data
-                )
-
-        instance.save()
+            added, images_changed = self._sync_images(instance, validated_data.pop('images'))
+            new_images += added
+            related_changed |= images_changed
+        if new_images:
+            PassImage.objects.bulk_create(new_images)
+            images_created(new_images)
+            related_changed = True
+
+        # Записываются только изменённые столбцы; пустой PATCH не пишет ничего.
+        # Версия проверяется в том же UPDATE, при гонке транзакция откатывается.
+        dirty = instance.get_dirty_fields() or []
+        if dirty or related_changed:
+            expected_version = self.context.get('expected_version', instance.version)
+            if not instance.save_if_current(expected_version, dirty, require_status='new'):
+                current = MountainPass.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+                if current != 'new':
+                    raise serializers.ValidationError(
+                        "Редактирование возможно только для записей со статусом 'new'"
+                    )
+                raise EditConflict()
         return instance
 
+    def _sync_images(self, instance, images_data):
+        """
+        Сравнивает присланный список с текущими изображениями: неизменённые
+        не трогаются, удалённые удаляются одним запросом, у оставленных
+        обновляются только названия. Возвращает ещё не сохранённые новые
+        изображения и признак того, что существующие изменились.
+        """
+        existing = {image.pk: image for image in instance.images.all()}
+        kept_ids = {data['id'] for data in images_data if 'id' in data}
+        unknown = kept_ids - existing.keys()
+        if unknown:
+            raise serializers.ValidationError(
+                {'images': f"Изображения {sorted(unknown)} не относятся к перевалу"}
+            )
+
+        renamed = []
+        for data in images_data:
+            if 'id' in data and 'title' in data and existing[data['id']].title != data['title']:
+                image = existing[data['id']]
+                image.title = data['title']
+                renamed.append(image)
+        if renamed:
+            PassImage.objects.bulk_update(renamed, ['title'])
+
+        removed_ids = existing.keys() - kept_ids
+        if removed_ids:
+            PassImage.objects.filter(pk__in=removed_ids).delete()
+
+        added = [
+            PassImage(mountain_pass=instance, **data)
+            for data in images_data if 'id' not in data
+        ]
+        return added, bool(renamed or removed_ids)
+
 
 class MountainPassListSerializer(serializers.ModelSerializer):
     """Сериализатор для списка перевалов"""
@@ -228,7 +429,29 @@ class StatusUpdateSerializer(serializers.Serializer):
     """Сериализатор для обновления статуса"""
     status = serializers.ChoiceField(choices=MountainPass.STATUS_CHOICES)
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        instance.status = validated_data.get('status', instance.status)
-        instance.save()
-        return instance
\ No newline at end of file
+        new_status = validated_data.get('status', instance.status)
+        old_status = instance.status
+        if new_status == old_status:
+            return instance
+
+        expected_version = self.context.get('expected_version', instance.version)
+        instance.status = new_status
+        if not instance.save_if_current(expected_version, ['status']):
+            raise EditConflict()
+
+        pass_status_changed.send(
+            sender=MountainPass,
+            changes=[StatusChange(instance.pk, instance.user_id, old_status, new_status)],
+            actor=self.context.get('actor', '')
+        )
+        return instance
+
+
+class PassStatusHistorySerializer(serializers.ModelSerializer):
+    """Сериализатор записи истории статусов"""
+
+    class Meta:
+        model = PassStatusHistory
+        fields = ['from_status', 'to_status', 'actor', 'changed_at']
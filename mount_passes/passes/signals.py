@@ -0,0 +1,136 @@
+from collections import namedtuple
+
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+
+from . import detail_cache, history, stats
+from .archive import archiving
+from .hashing import schedule_image_hashing
+from .models import Coords, Level, MountainPass, PassImage, User, denormalized_fields
+from .storage import release_blobs, retain_blobs
+
+# Смена статуса одного или нескольких перевалов. Отправляется внутри транзакции
+# записи с аргументами changes (список StatusChange) и actor.
+pass_status_changed = Signal()
+
+StatusChange = namedtuple('StatusChange', ['pass_id', 'user_id', 'old_status', 'new_status'])
+
+
+def images_created(images):
+    """
+    Учёт новых изображений. bulk_create не отправляет post_save,
+    поэтому массовые вставки вызывают эту функцию напрямую.
+    """
+    retain_blobs([image.image.name for image in images])
+    for image in images:
+        # Хэши считаются после ответа клиенту
+        schedule_image_hashing(image.pk)
+
+
+@receiver(post_save, sender=PassImage)
+def image_saved(sender, instance, created, **kwargs):
+    if created and not kwargs.get('raw'):
+        images_created([instance])
+
+
+@receiver(post_delete, sender=PassImage)
+def release_image_blob(sender, instance, **kwargs):
+    # Архивное изображение ссылается на тот же файл
+    if not archiving.get():
+        release_blobs([instance.image.name])
+
+
+@receiver(pass_status_changed)
+def invalidate_status_details(sender, changes, **kwargs):
+    detail_cache.invalidate([change.pass_id for change in changes])
+
+
+@receiver(post_save, sender=MountainPass)
+@receiver(post_delete, sender=MountainPass)
+def invalidate_pass_detail(sender, instance, **kwargs):
+    # archive_batch сбрасывает кэш всей пачки сам
+    if not archiving.get():
+        detail_cache.invalidate([instance.pk])
+
+
+@receiver(post_save, sender=PassImage)
+@receiver(post_delete, sender=PassImage)
+def invalidate_image_pass_detail(sender, instance, **kwargs):
+    if not archiving.get():
+        detail_cache.invalidate([instance.mountain_pass_id])
+
+
+@receiver(post_save, sender=Coords)
+@receiver(post_save, sender=Level)
+def update_pass_copies(sender, instance, created, **kwargs):
+    # Новые объекты ещё не привязаны к перевалу, его save() скопирует значения сам
+    if created or kwargs.get('raw'):
+        return
+    relation = 'coords' if sender is Coords else 'level'
+    ids = list(MountainPass.objects.filter(**{f"{relation}_id": instance.pk}).values_list('pk', flat=True))
+    if ids:
+        MountainPass.objects.filter(pk__in=ids).update(**denormalized_fields(**{relation: instance}))
+        detail_cache.invalidate(ids)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_pass_details(sender, instance, created, **kwargs):
+    if created or kwargs.get('raw'):
+        return
+    detail_cache.invalidate(list(MountainPass.objects.filter(user=instance).values_list('pk', flat=True)))
+
+
+@receiver(pass_status_changed)
+def notify_status_changes(sender, changes, **kwargs):
+    from .notifications import record_status_changes
+
+    record_status_changes(changes)
+
+
+@receiver(pass_status_changed)
+def record_status_history(sender, changes, actor='', **kwargs):
+    history.record_status_changes(changes, actor)
+
+
+@receiver(pass_status_changed)
+def update_status_stats(sender, changes, **kwargs):
+    stats.status_changed(changes)
+    stats.user_status_changed(changes)
+
+
+@receiver(post_save, sender=MountainPass)
+def count_new_pass(sender, instance, created, **kwargs):
+    if created and not kwargs.get('raw'):
+        stats.pass_added(instance)
+        stats.user_pass_added(instance)
+
+
+@receiver(pre_delete, sender=MountainPass)
+def uncount_deleted_pass(sender, instance, **kwargs):
+    # Архивный перевал остаётся в статистике
+    if archiving.get():
+        return
+    # До удаления: связанные координаты и уровень ещё доступны
+    stats.pass_removed(instance)
+    stats.user_pass_added(instance, delta=-1)
+
+
+@receiver(pre_save, sender=Coords)
+def update_height_stats(sender, instance, **kwargs):
+    if instance._state.adding or 'height' not in (instance.get_dirty_fields() or []):
+        return
+    if MountainPass.objects.filter(coords_id=instance.pk).exists():
+        stats.replace_keys(
+            [('height', stats.height_bucket(instance.loaded_value('height')))],
+            [('height', stats.height_bucket(instance.height))]
+        )
+
+
+@receiver(pre_save, sender=Level)
+def update_level_stats(sender, instance, **kwargs):
+    dirty = instance.get_dirty_fields() or []
+    if instance._state.adding or not set(dirty) & set(stats.SEASONS):
+        return
+    if MountainPass.objects.filter(level_id=instance.pk).exists():
+        old = Level(**{season: instance.loaded_value(season) for season in stats.SEASONS})
+        stats.replace_keys(stats.level_keys(old), stats.level_keys(instance))
@@ -0,0 +1,85 @@
+"""Старт воркера: профиль импортов и прогрев до приёма запросов"""
+import inspect
+import logging
+import re
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.urls import get_resolver
+from django.utils import translation
+
+logger = logging.getLogger(__name__)
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def parse_importtime(text):
+    """Строки вывода python -X importtime: [(модуль, собственное мкс, суммарное мкс, глубина)]"""
+    modules = []
+    for line in text.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return modules
+
+
+def aggregate_by_package(modules):
+    """Собственное время импорта, сложенное по пакетам верхнего уровня, по убыванию"""
+    totals = defaultdict(lambda: [0, 0])
+    for name, self_us, _, _ in modules:
+        package = totals[name.split('.')[0]]
+        package[0] += self_us
+        package[1] += 1
+    return sorted(
+        ((package, self_us, count) for package, (self_us, count) in totals.items()),
+        key=lambda item: item[1], reverse=True,
+    )
+
+
+def _serializer_classes():
+    from rest_framework.serializers import BaseSerializer
+
+    from . import serializers
+
+    for _, cls in inspect.getmembers(serializers, inspect.isclass):
+        if issubclass(cls, BaseSerializer) and cls.__module__ == serializers.__name__:
+            yield cls
+
+
+def warm_up():
+    """
+    Выполняет то, что иначе досталось бы первому запросу: разбор URLconf,
+    кэши полей моделей, построение полей сериализаторов (с ленивыми
+    импортами валидаторов и полей DRF) и загрузку переводов.
+    Соединение с БД не открывается: после fork его нельзя делить между воркерами.
+    """
+    started = time.perf_counter()
+    resolver = get_resolver()
+    resolver.url_patterns
+    # reverse_dict заполняется вместе с остальными таблицами резолвера
+    resolver.reverse_dict
+
+    for model in apps.get_models():
+        model._meta.get_fields()
+
+    for serializer_class in _serializer_classes():
+        try:
+            serializer_class().fields
+        except Exception as e:
+            logger.debug("Прогрев %s пропущен: %s", serializer_class.__name__, e)
+
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext("This field is required.")
+
+    elapsed = time.perf_counter() - started
+    logger.info("Прогрев воркера: %.0f мс", elapsed * 1000)
+    return elapsed
+
+
+def maybe_warm_up():
+    """Хук для wsgi/asgi: прогрев при PASS_WARM_UP=True"""
+    if settings.PASS_WARM_UP:
+        warm_up()
@@ -0,0 +1,271 @@
+"""Статистика перевалов на предрасчитанных счётчиках PassStatsRollup"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+SEASONS = ('winter', 'summer', 'autumn', 'spring')
+EMPTY_BUCKET = 'none'
+
+
+def height_bucket(height):
+    """Нижняя граница диапазона высоты шириной PASS_STATS_HEIGHT_STEP"""
+    step = settings.PASS_STATS_HEIGHT_STEP
+    return str(height // step * step)
+
+
+def level_keys(level):
+    return [(f"level_{season}", getattr(level, season) or EMPTY_BUCKET) for season in SEASONS]
+
+
+def pass_keys(mountain_pass):
+    """Корзины всех метрик, в которые входит перевал"""
+    return [
+        ('status', mountain_pass.status),
+        ('height', height_bucket(mountain_pass.coords.height)),
+        ('day', timezone.localdate(mountain_pass.add_time).isoformat()),
+        *level_keys(mountain_pass.level),
+    ]
+
+
+def apply_deltas(deltas):
+    """
+    Изменяет счётчики: deltas - Counter {(metric, bucket): delta}.
+    Недостающие строки создаются одним INSERT, затем один UPDATE на каждое
+    значение delta, независимо от числа корзин.
+    """
+    from .models import PassStatsRollup
+
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    PassStatsRollup.objects.bulk_create(
+        [PassStatsRollup(metric=metric, bucket=bucket) for metric, bucket in deltas],
+        ignore_conflicts=True
+    )
+    by_delta = defaultdict(list)
+    for key, delta in deltas.items():
+        by_delta[delta].append(key)
+    for delta, keys in by_delta.items():
+        condition = Q()
+        for metric, bucket in keys:
+            condition |= Q(metric=metric, bucket=bucket)
+        PassStatsRollup.objects.filter(condition).update(count=F('count') + delta)
+
+
+def pass_added(mountain_pass):
+    apply_deltas(Counter(pass_keys(mountain_pass)))
+
+
+def pass_removed(mountain_pass):
+    apply_deltas(Counter({key: -1 for key in pass_keys(mountain_pass)}))
+
+
+def status_changed(changes):
+    deltas = Counter()
+    for change in changes:
+        deltas[('status', change.old_status)] -= 1
+        deltas[('status', change.new_status)] += 1
+    apply_deltas(deltas)
+
+
+def replace_keys(old_keys, new_keys):
+    deltas = Counter(new_keys)
+    deltas.subtract(Counter(old_keys))
+    apply_deltas(deltas)
+
+
+def _table_counts(queryset, height_field, level_prefix):
+    """Счётчики всех метрик по одной таблице перевалов"""
+    from django.db.models.functions import TruncDate
+
+    step = settings.PASS_STATS_HEIGHT_STEP
+    counts = Counter()
+    for row in queryset.values('status').annotate(count=Count('id')).order_by():
+        counts[('status', row['status'])] += row['count']
+    rows = (
+        queryset.annotate(bucket=F(height_field) / step * step)
+        .values('bucket').annotate(count=Count('id')).order_by()
+    )
+    for row in rows:
+        counts[('height', str(row['bucket']))] += row['count']
+    rows = (
+        queryset.annotate(day=TruncDate('add_time'))
+        .values('day').annotate(count=Count('id')).order_by()
+    )
+    for row in rows:
+        counts[('day', row['day'].isoformat())] += row['count']
+    for season in SEASONS:
+        field = f"{level_prefix}{season}"
+        for row in queryset.values(field).annotate(count=Count('id')).order_by():
+            counts[(f"level_{season}", row[field] or EMPTY_BUCKET)] += row['count']
+    return counts
+
+
+def count_passes(mountain_passes, archived_passes):
+    """
+    Счётчики всех метрик агрегирующими запросами по рабочей таблице и архиву.
+    Принимает выборки, поэтому годится и для моделей из миграций.
+    """
+    counts = _table_counts(mountain_passes, 'coords__height', 'level__')
+    counts.update(_table_counts(archived_passes, 'height', ''))
+    return counts
+
+
+@transaction.atomic
+def rebuild_stats():
+    """Полный пересчёт счётчиков по рабочей таблице и архиву"""
+    from .models import ArchivedPass, MountainPass, PassStatsRollup
+
+    if connection.vendor == 'postgresql':
+        # Писатели ждут конца пересчёта (EXCLUSIVE не мешает только чтению):
+        # иначе изменение, учтённое в счётчиках между подсчётом и заменой
+        # строк, потерялось бы. Блокировка берётся до подсчёта, поэтому
+        # подсчёт видит все изменения, уже попавшие в счётчики
+        with connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {PassStatsRollup._meta.db_table} IN EXCLUSIVE MODE')
+    counts = count_passes(MountainPass.objects.all(), ArchivedPass.objects.all())
+
+    PassStatsRollup.objects.all().delete()
+    PassStatsRollup.objects.bulk_create(
+        PassStatsRollup(metric=metric, bucket=bucket, count=count)
+        for (metric, bucket), count in counts.items()
+    )
+    return counts
+
+
+def read_stats(days):
+    """Данные для дашборда одним запросом к счётчикам"""
+    from .models import PassStatsRollup
+
+    since = (timezone.localdate() - timedelta(days=days - 1)).isoformat()
+    rows = PassStatsRollup.objects.filter(count__gt=0).filter(
+        ~Q(metric='day') | Q(bucket__gte=since)
+    ).values_list('metric', 'bucket', 'count')
+
+    result = {
+        'total': 0,
+        'status': {},
+        'level': {season: {} for season in SEASONS},
+        'height': {},
+        'per_day': {},
+    }
+    for metric, bucket, count in rows:
+        if metric == 'status':
+            result['status'][bucket] = count
+            result['total'] += count
+        elif metric == 'height':
+            result['height'][bucket] = count
+        elif metric == 'day':
+            result['per_day'][bucket] = count
+        else:
+            result['level'][metric.removeprefix('level_')][bucket] = count
+    result['height'] = dict(sorted(result['height'].items(), key=lambda item: int(item[0])))
+    result['per_day'] = [{'day': day, 'count': count} for day, count in sorted(result['per_day'].items())]
+    return result
+
+
+def change_user_counts(deltas):
+    """
+    Изменяет счётчики пользователей: deltas - {user_id: Counter({поле: delta})}.
+    Пользователи с одинаковыми изменениями обновляются одним UPDATE.
+    """
+    from .models import UserPassStats
+
+    deltas = {
+        user_id: {field: delta for field, delta in fields.items() if delta}
+        for user_id, fields in deltas.items()
+    }
+    # Строки создаются только при увеличении: уменьшение без строки означает,
+    # что счётчиков ещё нет, их посчитает user_pass_counts
+    growing = [user_id for user_id, fields in deltas.items() if any(d > 0 for d in fields.values())]
+    if growing:
+        UserPassStats.objects.bulk_create(
+            [UserPassStats(user_id=user_id) for user_id in growing], ignore_conflicts=True
+        )
+    by_change = defaultdict(list)
+    for user_id, fields in deltas.items():
+        if fields:
+            by_change[tuple(sorted(fields.items()))].append(user_id)
+    for change, user_ids in by_change.items():
+        UserPassStats.objects.filter(user_id__in=user_ids).update(
+            **{field: F(field) + delta for field, delta in change}
+        )
+
+
+def user_pass_added(mountain_pass, delta=1):
+    change_user_counts({mountain_pass.user_id: Counter({'total': delta, mountain_pass.status: delta})})
+
+
+def user_status_changed(changes):
+    deltas = defaultdict(Counter)
+    for change in changes:
+        deltas[change.user_id][change.old_status] -= 1
+        deltas[change.user_id][change.new_status] += 1
+    change_user_counts(deltas)
+
+
+def _count_user_passes(user_ids=None):
+    """Счётчики пользователей по рабочей таблице и архиву"""
+    from .models import ArchivedPass, MountainPass, UserPassStats
+
+    statuses = [field for field in UserPassStats.COUNTER_FIELDS if field != 'total']
+    result = defaultdict(Counter)
+    for model in (MountainPass, ArchivedPass):
+        queryset = model.objects.all()
+        if user_ids is not None:
+            queryset = queryset.filter(user_id__in=user_ids)
+        rows = queryset.values('user_id').annotate(
+            total=Count('id'),
+            **{status: Count('id', filter=Q(status=status)) for status in statuses}
+        ).order_by()
+        for row in rows:
+            result[row.pop('user_id')].update(row)
+    return {user_id: dict(counts) for user_id, counts in result.items()}
+
+
+def user_pass_counts(user):
+    """
+    Счётчики перевалов пользователя без COUNT по перевалам. Если счётчиков
+    ещё нет (пользователь до миграции), они считаются один раз и сохраняются.
+    """
+    from .models import UserPassStats
+
+    try:
+        return user.pass_stats.as_dict()
+    except UserPassStats.DoesNotExist:
+        pass
+    counts = _count_user_passes([user.pk]).get(user.pk, {})
+    stats, _ = UserPassStats.objects.get_or_create(user=user, defaults=counts)
+    return stats.as_dict()
+
+
+@transaction.atomic
+def reconcile_user_stats(batch_size=1000):
+    """Сверяет счётчики пользователей с таблицей перевалов, возвращает число исправленных"""
+    from .models import User, UserPassStats
+
+    fixed = 0
+    user_ids = User.objects.order_by('pk').values_list('pk', flat=True)
+    for start in range(0, user_ids.count(), batch_size):
+        batch = list(user_ids[start:start + batch_size])
+        actual = _count_user_passes(batch)
+        existing = UserPassStats.objects.in_bulk(batch)
+        changed, missing = [], []
+        for user_id in batch:
+            counts = actual.get(user_id, {})
+            expected = {field: counts.get(field, 0) for field in UserPassStats.COUNTER_FIELDS}
+            stats = existing.get(user_id)
+            if stats is None:
+                missing.append(UserPassStats(user_id=user_id, **expected))
+            elif stats.as_dict() != expected:
+                for field, value in expected.items():
+                    setattr(stats, field, value)
+                changed.append(stats)
+        UserPassStats.objects.bulk_create(missing)
+        UserPassStats.objects.bulk_update(changed, UserPassStats.COUNTER_FIELDS)
+        fixed += len(changed) + len(missing)
+    return fixed
@@ -0,0 +1,274 @@
+"""Хранилища изображений: локальное с адресацией по содержимому и S3-совместимое"""
+import hashlib
+import hmac
+import os
+import tempfile
+import xml.etree.ElementTree as ElementTree
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+from email.utils import parsedate_to_datetime
+from urllib.error import HTTPError
+from urllib.parse import quote, urlsplit
+from urllib.request import Request, urlopen
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, Storage, storages
+from django.db.models import F
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+TMP_DIR = '.tmp'
+
+
+def pass_image_storage():
+    """Хранилище для PassImage.image, настраивается через STORAGES['pass_images']"""
+    return storages['pass_images']
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Файлы сохраняются под именем <prefix>/ab/cd/<sha256><ext>.
+    Одинаковое содержимое хранится один раз, два уровня по 256 каталогов
+    ограничивают число файлов в одном каталоге.
+    """
+    chunk_size = 64 * 1024
+
+    def __init__(self, prefix='pass_images', shard_levels=2, **kwargs):
+        super().__init__(**kwargs)
+        self.prefix = prefix
+        self.shard_levels = shard_levels
+
+    def blob_name(self, digest, extension=''):
+        shards = [digest[i * 2:i * 2 + 2] for i in range(self.shard_levels)]
+        return '/'.join([self.prefix, *shards, f"{digest}{extension.lower()}"])
+
+    def get_available_name(self, name, max_length=None):
+        # Одинаковое имя означает одинаковое содержимое, суффиксы не нужны
+        return name
+
+    def _save(self, name, content):
+        tmp_dir = self.path(os.path.join(self.prefix, TMP_DIR))
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks(self.chunk_size):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    tmp_file.write(chunk)
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+
+            final_name = self.blob_name(digest.hexdigest(), os.path.splitext(name)[1])
+            final_path = self.path(final_name)
+            reused = os.path.exists(final_path)
+            if reused:
+                # Сначала продлеваем запись, потом проверяем файл: сборщик мусора
+                # удаляет файл под блокировкой строки, register_blob ждёт её,
+                # и после него файл либо защищён сроком, либо уже удалён
+                register_blob(final_name, digest.hexdigest(), size)
+            if reused and os.path.exists(final_path):
+                os.unlink(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(tmp_path, self.file_permissions_mode)
+                # rename атомарен: читатели видят либо целый файл, либо ничего
+                os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        if not reused:
+            register_blob(final_name, digest.hexdigest(), size)
+        return final_name
+
+
+def register_blob(name, sha256, size):
+    """Создаёт запись о файле или обновляет время последнего использования"""
+    from .models import ImageBlob
+
+    # update, а не get_or_create: строку, прочитанную до удаления сборщиком
+    # мусора, нельзя считать живой - update вернёт 0, и запись создастся заново
+    if not ImageBlob.objects.filter(name=name).update(updated_at=timezone.now()):
+        ImageBlob.objects.get_or_create(name=name, defaults={'sha256': sha256, 'size': size})
+
+
+def _change_refs(names, delta):
+    from .models import ImageBlob
+
+    counts = Counter(name for name in names if name)
+    by_count = {}
+    for name, count in counts.items():
+        by_count.setdefault(count, []).append(name)
+    for count, group in by_count.items():
+        ImageBlob.objects.filter(name__in=group).update(
+            ref_count=F('ref_count') + delta * count,
+            updated_at=timezone.now()
+        )
+
+
+def retain_blobs(names):
+    """Увеличивает счётчики ссылок на файлы"""
+    _change_refs(names, 1)
+
+
+def release_blobs(names):
+    """Уменьшает счётчики ссылок; файлы удаляет collect_image_blobs"""
+    _change_refs(names, -1)
+
+
+@deconstructible
+class ObjectStoreStorage(Storage):
+    """
+    S3-совместимое хранилище (S3, MinIO) с подписью запросов AWS SigV4.
+    Все запросы, включая серверные, идут по подписанным URL, поэтому
+    клиент может загружать файлы напрямую, минуя процессы Django.
+    """
+
+    def __init__(self, endpoint_url, bucket, access_key, secret_key, region='us-east-1',
+                 public_url=None, addressing_style='path', url_expires=3600, timeout=10):
+        self.endpoint_url = endpoint_url.rstrip('/')
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.public_url = public_url.rstrip('/') if public_url else None
+        self.addressing_style = addressing_style
+        self.url_expires = url_expires
+        self.timeout = timeout
+
+    def _location(self, key):
+        parts = urlsplit(self.endpoint_url)
+        quoted_key = quote(key, safe='/~')
+        if self.addressing_style == 'virtual':
+            return parts.scheme, f"{self.bucket}.{parts.netloc}", f"/{quoted_key}"
+        if not key:
+            # Запросы к самому бакету (список объектов)
+            return parts.scheme, parts.netloc, f"/{self.bucket}"
+        return parts.scheme, parts.netloc, f"/{self.bucket}/{quoted_key}"
+
+    def _signing_key(self, datestamp):
+        key = f"AWS4{self.secret_key}".encode()
+        for part in (datestamp, self.region, 's3', 'aws4_request'):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        return key
+
+    def presigned_url(self, method, key, expires=None, now=None, params=None):
+        """URL с подписью в параметрах запроса (query string auth)"""
+        now = now or datetime.now(dt_timezone.utc)
+        amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+        datestamp = amz_date[:8]
+        scope = f"{datestamp}/{self.region}/s3/aws4_request"
+        scheme, host, path = self._location(key)
+
+        query = {
+            'X-Amz-Algorithm': 'AWS4-HMAC-SHA256',
+            'X-Amz-Credential': f"{self.access_key}/{scope}",
+            'X-Amz-Date': amz_date,
+            'X-Amz-Expires': str(expires or self.url_expires),
+            'X-Amz-SignedHeaders': 'host',
+            **(params or {}),
+        }
+        canonical_query = '&'.join(
+            f"{quote(k, safe='~')}={quote(v, safe='~')}" for k, v in sorted(query.items())
+        )
+        canonical_request = '\n'.join([
+            method, path, canonical_query, f"host:{host}\n", 'host', 'UNSIGNED-PAYLOAD'
+        ])
+        string_to_sign = '\n'.join([
+            'AWS4-HMAC-SHA256', amz_date, scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest()
+        ])
+        signature = hmac.new(
+            self._signing_key(datestamp), string_to_sign.encode(), hashlib.sha256
+        ).hexdigest()
+        return f"{scheme}://{host}{path}?{canonical_query}&X-Amz-Signature={signature}"
+
+    def _request(self, method, key, data=None, headers=None, params=None):
+        request = Request(
+            self.presigned_url(method, key, params=params), data=data, method=method, headers=headers or {}
+        )
+        return urlopen(request, timeout=self.timeout)
+
+    def head(self, key):
+        """Метаданные объекта или None, если его нет"""
+        try:
+            with self._request('HEAD', key) as response:
+                last_modified = response.headers.get('Last-Modified')
+                return {
+                    'size': int(response.headers.get('Content-Length', 0)),
+                    'content_type': response.headers.get('Content-Type', ''),
+                    'modified': parsedate_to_datetime(last_modified) if last_modified else None,
+                }
+        except HTTPError as e:
+            if e.code in (403, 404):
+                return None
+            raise
+
+    def _open(self, name, mode='rb'):
+        with self._request('GET', name) as response:
+            return ContentFile(response.read(), name=name)
+
+    def _save(self, name, content):
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        headers = {'Content-Length': str(content.size)}
+        content_type = getattr(content, 'content_type', None)
+        if content_type:
+            headers['Content-Type'] = content_type
+        with self._request('PUT', name, data=content, headers=headers):
+            pass
+        return name
+
+    def delete(self, name):
+        try:
+            with self._request('DELETE', name):
+                pass
+        except HTTPError as e:
+            if e.code != 404:
+                raise
+
+    def exists(self, name):
+        return self.head(name) is not None
+
+    def size(self, name):
+        meta = self.head(name)
+        if meta is None:
+            raise FileNotFoundError(name)
+        return meta['size']
+
+    def get_modified_time(self, name):
+        meta = self.head(name)
+        if meta is None:
+            raise FileNotFoundError(name)
+        return meta['modified']
+
+    def listdir(self, path):
+        """Подкаталоги и файлы path по ListObjectsV2 с разделителем '/'"""
+        prefix = f"{path.strip('/')}/" if path.strip('/') else ''
+        directories, files = [], []
+        params = {'list-type': '2', 'delimiter': '/', 'prefix': prefix}
+        while True:
+            with self._request('GET', '', params=params) as response:
+                root = ElementTree.fromstring(response.read())
+            for item in root.iterfind('{*}CommonPrefixes/{*}Prefix'):
+                directories.append(item.text[len(prefix):].rstrip('/'))
+            for item in root.iterfind('{*}Contents/{*}Key'):
+                files.append(item.text[len(prefix):])
+            token = root.findtext('{*}NextContinuationToken')
+            if root.findtext('{*}IsTruncated') != 'true' or not token:
+                return directories, files
+            params = {**params, 'continuation-token': token}
+
+    def url(self, name):
+        if self.public_url:
+            return f"{self.public_url}/{quote(name, safe='/~')}"
+        return self.presigned_url('GET', name)
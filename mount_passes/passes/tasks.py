@@ -0,0 +1,24 @@
+"""Задачи фоновой очереди приложения passes"""
+from .jobs import task
+
+
+@task('passes.hash_image')
+def hash_image(image_id):
+    from .hashing import compute_image_hashes
+    from .models import PassImage
+
+    image = PassImage.objects.filter(pk=image_id).first()
+    if image is not None:
+        compute_image_hashes(image)
+
+
+@task('passes.dispatch_notifications')
+def dispatch_notifications():
+    from .notifications import dispatch_notifications
+
+    dispatch_notifications()
+
+
+@task('passes.noop')
+def noop(**kwargs):
+    """Пустая задача для проверки и замеров очереди"""
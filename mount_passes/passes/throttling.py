@@ -0,0 +1,183 @@
+"""Ограничение частоты запросов: token bucket по IP, отправителю и эндпоинту"""
+import math
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@lru_cache(maxsize=64)
+def parse_rate(rate):
+    """'20/min' или '20/min:40' -> (ёмкость ведра, секунд на один токен)"""
+    count, rest = rate.split('/')
+    period, _, burst = rest.partition(':')
+    count = int(count)
+    return int(burst or count), PERIODS[period] / count
+
+
+class CacheBuckets:
+    """
+    Вёдра в общем кэше (Redis, Memcached). Хранится теоретическое время
+    прихода следующего запроса (GCRA) в микросекундах. Токен расходуется
+    атомарным incr; вместе с продлением срока ключа это две операции с кэшем
+    на запрос, при отказе три (возврат токена decr). Первый запрос клиента
+    и запрос в полное ведро вместо продления записывают ключ заново (add/set).
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def consume(self, key, capacity, interval):
+        """0, если токен взят; иначе сколько секунд ждать следующего"""
+        now = int(time.time() * 1_000_000)
+        step = int(interval * 1_000_000)
+        try:
+            tat = self.cache.incr(key, step)
+        except ValueError:
+            if self.cache.add(key, now + step, self._ttl(step)):
+                return 0
+            tat = self.cache.incr(key, step)
+
+        if tat - step < now:
+            # Ведро было полным: время догоняет текущее, срок ключа задаёт set.
+            # Гонка двух таких запросов теряет не больше одного токена
+            self.cache.set(key, now + step, self._ttl(step))
+            return 0
+
+        excess = tat - now - capacity * step
+        if excess > 0:
+            # Отказ токен не расходует
+            tat = self.cache.decr(key, step)
+        # incr не продлевает срок ключа: без этого ведро клиента, который
+        # держится у лимита, истекло бы и снова стало полным
+        self.cache.touch(key, self._ttl(tat - now))
+        return excess / 1_000_000 if excess > 0 else 0
+
+    @staticmethod
+    def _ttl(microseconds):
+        """Ключ живёт, пока ведро не наполнится снова"""
+        return math.ceil(max(microseconds, 0) / 1_000_000) + 1
+
+
+class LocalBuckets:
+    """
+    Вёдра в памяти процесса без блокировок, когда общего кэша нет.
+    Параллельные потоки могут изредка пропустить лишний запрос,
+    а лимит действует на каждый процесс отдельно.
+    """
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self.tat = {}
+
+    def consume(self, key, capacity, interval):
+        now = time.monotonic()
+        tat = max(self.tat.get(key, now), now) + interval
+        excess = tat - now - capacity * interval
+        # Погрешность float при больших monotonic() не должна отнимать токен
+        if excess > 1e-6:
+            return excess
+        if len(self.tat) >= self.max_keys:
+            self._prune(now)
+        self.tat[key] = tat
+        return 0
+
+    def _prune(self, now):
+        # Полные вёдра ничем не отличаются от отсутствующих
+        for key, tat in list(self.tat.items()):
+            if tat <= now:
+                self.tat.pop(key, None)
+
+    def clear(self):
+        self.tat.clear()
+
+
+local_buckets = LocalBuckets()
+
+
+def is_shared_cache(alias):
+    """Кэш доступен всем процессам (не память процесса и не заглушка)"""
+    return bool(alias) and settings.CACHES[alias]['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+
+def get_buckets():
+    """Общий кэш из PASS_THROTTLE_CACHE или локальные вёдра процесса"""
+    alias = settings.PASS_THROTTLE_CACHE
+    if is_shared_cache(alias):
+        return CacheBuckets(caches[alias])
+    return local_buckets
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Базовый класс: ведро на ключ, ставка из PASS_THROTTLE_RATES[kind]"""
+    kind = None
+
+    def get_rate(self, request, view):
+        return settings.PASS_THROTTLE_RATES.get(self.kind)
+
+    def get_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.retry_after = 0
+        if not settings.PASS_THROTTLE_ENABLED:
+            return True
+        rate = self.get_rate(request, view)
+        key = self.get_key(request, view) if rate else None
+        if key is None:
+            return True
+        capacity, interval = parse_rate(rate)
+        self.retry_after = get_buckets().consume(f"throttle:{self.kind}:{key}", capacity, interval)
+        return not self.retry_after
+
+    def wait(self):
+        return self.retry_after
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Все запросы с одного IP"""
+    kind = 'ip'
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class SubmitterThrottle(TokenBucketThrottle):
+    """Создание перевалов от одного user.email"""
+    kind = 'submitter'
+
+    def get_key(self, request, view):
+        if request.method != 'POST' or getattr(view, 'action', None) != 'create':
+            return None
+        user = request.data.get('user') if hasattr(request.data, 'get') else None
+        email = user.get('email') if isinstance(user, dict) else None
+        return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+def endpoint_scope(view):
+    """Имя эндпоинта: throttle_scope представления или <basename>.<action>"""
+    scope = getattr(view, 'throttle_scope', None)
+    if scope:
+        return scope
+    basename, action = getattr(view, 'basename', None), getattr(view, 'action', None)
+    return f"{basename}.{action}" if basename and action else None
+
+
+class EndpointThrottle(TokenBucketThrottle):
+    """Общий лимит эндпоинта на всех клиентов, ставки в PASS_THROTTLE_ENDPOINT_RATES"""
+    kind = 'endpoint'
+
+    def get_rate(self, request, view):
+        self.scope = endpoint_scope(view)
+        return settings.PASS_THROTTLE_ENDPOINT_RATES.get(self.scope)
+
+    def get_key(self, request, view):
+        return self.scope
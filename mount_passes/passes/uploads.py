@@ -0,0 +1,126 @@
+"""Возобновляемая загрузка изображений по частям"""
+import fcntl
+import os
+
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import PassImage, UploadSession
+from .storage import register_blob
+
+CHUNK_READ_SIZE = 64 * 1024
+
+
+class UploadOffsetConflict(Exception):
+    """Смещение в запросе не совпадает с числом уже полученных байт"""
+
+    def __init__(self, offset):
+        super().__init__(f"Ожидается смещение {offset}")
+        self.offset = offset
+
+
+def append_chunk(session, offset, stream, length):
+    """
+    Дописывает часть файла с позиции offset, читая запрос кусками.
+    Пишет только владелец блокировки файла части (flock); транзакция на время
+    передачи не открывается. Параллельный PATCH получает 409, а не обрезает
+    файл первого запроса. Возвращает новое смещение.
+    """
+    if session.status != 'active':
+        raise serializers.ValidationError("Загрузка уже завершена")
+    path = session.part_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'ab') as part:
+        try:
+            fcntl.flock(part.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            # Часть сейчас пишет другой запрос
+            session.refresh_from_db(fields=['offset', 'status'])
+            raise UploadOffsetConflict(session.offset)
+        # Смещение читаем под блокировкой: объект сессии мог устареть
+        session.refresh_from_db(fields=['offset', 'status'])
+        if session.status != 'active':
+            raise serializers.ValidationError("Загрузка уже завершена")
+        if offset != session.offset:
+            raise UploadOffsetConflict(session.offset)
+        if offset + length > session.size:
+            raise serializers.ValidationError("Часть выходит за пределы заявленного размера файла")
+
+        # Байты после подтверждённого смещения остались от оборванного запроса
+        part.truncate(offset)
+        remaining = length
+        while remaining > 0:
+            chunk = stream.read(min(CHUNK_READ_SIZE, remaining))
+            if not chunk:
+                break
+            part.write(chunk)
+            remaining -= len(chunk)
+        part.flush()
+        os.fsync(part.fileno())
+        new_offset = part.tell()
+
+        # Смещение продвигается, только если его никто не сдвинул
+        moved = UploadSession.objects.filter(pk=session.pk, offset=offset, status='active').update(
+            offset=new_offset, updated_at=timezone.now()
+        )
+        if not moved:
+            session.refresh_from_db(fields=['offset', 'status'])
+            raise UploadOffsetConflict(session.offset)
+    session.offset = new_offset
+    return new_offset
+
+
+def finalize_upload(session):
+    """
+    Проверяет собранный файл и прикрепляет его к перевалу как PassImage.
+    Завершает загрузку только запрос, переведший сессию из 'active'
+    условным UPDATE; параллельный повтор получает то же изображение.
+    """
+    with transaction.atomic():
+        locked = (
+            UploadSession.objects.select_for_update(of=('self',))
+            .select_related('mountain_pass', 'image')
+            .get(pk=session.pk)
+        )
+        if locked.status == 'completed':
+            return locked.image
+        if not locked.is_complete():
+            raise serializers.ValidationError(f"Получено {locked.offset} из {locked.size} байт")
+        if not locked.mountain_pass.can_be_edited():
+            raise serializers.ValidationError(
+                "Редактирование возможно только для записей со статусом 'new'"
+            )
+
+        # PIL нужен только здесь, воркер не загружает его при старте
+        from PIL import Image, UnidentifiedImageError
+
+        path = locked.part_path
+        try:
+            with Image.open(path) as picture:
+                picture.verify()
+        except (UnidentifiedImageError, OSError):
+            raise serializers.ValidationError("Файл не является изображением")
+
+        with open(path, 'rb') as part:
+            image = PassImage.objects.create(
+                mountain_pass=locked.mountain_pass,
+                title=locked.title,
+                image=File(part, name=locked.filename)
+            )
+        finished = UploadSession.objects.filter(pk=locked.pk, status='active').update(
+            image=image, status='completed', updated_at=timezone.now()
+        )
+        if not finished:
+            # Сессию завершил другой запрос: изображение этого откатывается.
+            # Файл адресован по содержимому и общий с изображением победителя,
+            # поэтому не удаляется: лишний файл уберёт collect_image_blobs
+            transaction.set_rollback(True)
+    if not finished:
+        # Откат унёс и запись ImageBlob, если её создал этот запрос
+        register_blob(image.image.name, '', image.image.size)
+        return UploadSession.objects.select_related('image').get(pk=locked.pk).image
+    session.image, session.status = image, 'completed'
+    path.unlink(missing_ok=True)
+    return image
@@ -1,39 +1,37 @@
+from django.conf import settings
 from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from .views import MountainPassViewSet, UserPassesListView
+from .views import (
+    DatabasePoolStatsView,
+    MountainPassViewSet,
+    PassStatsView,
+    UserPassesListView,
+    UploadSessionViewSet,
+    UploadSlotsView,
+    api_docs,
+    api_schema,
+    pass_events,
+)
 
 router = DefaultRouter()
 router.register(r'submitData', MountainPassViewSet, basename='mountainpass')
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Mountain Passes API",
-        default_version='v1',
-        description="API для сбора и модерации данных о горных перевалах",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="contact@example.com"),
-        license=openapi.License(name="MIT License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+router.register(r'uploads', UploadSessionViewSet, basename='upload')
 
 urlpatterns = [
     # API endpoints
-    path('', include(router.urls)),
+    # Объявлены до роутера, иначе их перехватит маршрут submitData/<pk>/
+    path('submitData/events/', pass_events, name='pass-events'),
     path('submitData/user_passes/', UserPassesListView.as_view(), name='user-passes'),
+    path('', include(router.urls)),
+    path('uploads/slots/', UploadSlotsView.as_view(), name='upload-slots'),
+    path('stats/', PassStatsView.as_view(), name='pass-stats'),
+    path('health/db/', DatabasePoolStatsView.as_view(), name='db-pool-stats'),
+]
 
-    # Swagger documentation
-    re_path(r'^swagger(?P<format>\.json|\.yaml)$',
-            schema_view.without_ui(cache_timeout=0),
-            name='schema-json'),
-    path('swagger/',
-         schema_view.with_ui('swagger', cache_timeout=0),
-         name='schema-swagger-ui'),
-    path('redoc/',
-         schema_view.with_ui('redoc', cache_timeout=0),
-         name='schema-redoc'),
-]
\ No newline at end of file
+if settings.PASS_API_DOCS:
+    urlpatterns += [
+        # Swagger documentation: схема генерируется один раз на версию кода (manage.py generate_api_schema)
+        re_path(r'^swagger(?P<format>\.json|\.yaml)$', api_schema, name='schema-json'),
+        path('swagger/', api_docs, {'ui': 'swagger'}, name='schema-swagger-ui'),
+        path('redoc/', api_docs, {'ui': 'redoc'}, name='schema-redoc'),
+    ]
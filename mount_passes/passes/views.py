@@ -1,29 +1,127 @@
 import logging
-from django.http import Http404
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.utils.functional import cached_property
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_GET
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets, filters, serializers
 from rest_framework.decorators import action
 from rest_framework.generics import ListAPIView
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
-from .models import MountainPass, User
+from rest_framework.views import APIView
+from . import detail_cache
+from .archive import UserPassList, archived_passes, get_archived, pass_exists
+from .dbpool import pool_stats
+from .events import Subscription, stream_events
+from .exceptions import EditConflict, PreconditionFailed, PreconditionRequired, UnknownFields
+from .fieldsets import requested_fields, shape_queryset
+from .filters import MountainPassFilter
+from .history import daily_moderation_rates, pass_timeline
+from .models import ArchivedPass, MountainPass, PassImage, UploadSession, User
 from .serializers import (
     MountainPassDetailSerializer,
     MountainPassCreateSerializer,
     MountainPassUpdateSerializer,
     MountainPassListSerializer,
+    PassStatusHistorySerializer,
     StatusUpdateSerializer,
+    UploadSessionSerializer,
+    UploadSlotRequestSerializer,
 )
+from .pagination import KnownCountPagination
+from .replicas import ReplicaReadMixin, replica_set
+from .schema import FORMATS, get_document, render_docs_page
+from .stats import read_stats, user_pass_counts
+from .storage import pass_image_storage
+from .uploads import UploadOffsetConflict, append_chunk, finalize_upload
 
 logger = logging.getLogger(__name__)
 
 
-class MountainPassViewSet(viewsets.ModelViewSet):
+def _etag_in(etag, tags):
+    """ETag среди разобранных тегов: сравнение целиком без W/, * совпадает с любым"""
+    return '*' in tags or etag.removeprefix('W/') in [tag.removeprefix('W/') for tag in tags]
+
+
+def expected_version(request, instance):
+    """
+    Версия, которую клиент видел перед изменением (заголовок If-Match).
+    Без заголовка используется только что прочитанная версия.
+    """
+    if_match = request.headers.get('If-Match')
+    if not if_match:
+        if settings.PASSES_REQUIRE_IF_MATCH:
+            raise PreconditionRequired()
+        return instance.version
+    # Неразборчивый заголовок не даёт тегов и ни с чем не совпадает
+    if not _etag_in(instance.etag, parse_etags(if_match)):
+        raise PreconditionFailed()
+    return instance.version
+
+
+def etag_matches(request, etag):
+    """Совпадает ли ETag с одним из тегов If-None-Match"""
+    return _etag_in(etag, parse_etags(request.headers.get('If-None-Match', '')))
+
+
+def parse_ids(value):
+    """id перевалов из "1,2,3" или списка: без повторов, не больше PASS_BATCH_MAX_IDS"""
+    if isinstance(value, str):
+        value = [item for item in value.split(',') if item.strip()]
+    if not value or not isinstance(value, (list, tuple)):
+        raise ValueError("Не указаны ids")
+    try:
+        ids = list(dict.fromkeys(int(item) for item in value))
+    except (TypeError, ValueError):
+        raise ValueError("ids должны быть целыми числами")
+    if len(ids) > settings.PASS_BATCH_MAX_IDS:
+        raise ValueError(f"Не больше {settings.PASS_BATCH_MAX_IDS} id за запрос")
+    return ids
+
+
+class MountainPassViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """ViewSet для управления перевалами"""
     permission_classes = [AllowAny]
+    # Действия, которые читают с реплики (если реплики настроены)
+    replica_actions = ('list', 'retrieve', 'batch', 'history', 'moderation_stats')
+    read_actions = ('batch',)
+    # Порядок (перевал, время) совпадает с индексом passes_image_pass_idx
+    images_queryset = PassImage.objects.order_by('mountain_pass_id', 'created_at')
     queryset = MountainPass.objects.all().select_related(
         'user', 'coords', 'level'
-    ).prefetch_related('images')
+    ).prefetch_related(
+        Prefetch('images', queryset=images_queryset)
+    )
+    filterset_class = MountainPassFilter
+    # Действия, где работают ?fields= и ?expand=
+    sparse_actions = ('list', 'retrieve')
+
+    @cached_property
+    def sparse_fields(self):
+        """Поля, выбранные клиентом, или None для набора по умолчанию"""
+        # При генерации схемы OpenAPI запроса нет
+        if self.action not in self.sparse_actions or getattr(self, 'request', None) is None:
+            return None
+        default = MountainPassListSerializer.Meta.fields if self.action == 'list' else None
+        available = MountainPassDetailSerializer.Meta.fields
+        return requested_fields(self.request.query_params, available, default or available)
+
+    def get_queryset(self):
+        if self.action not in self.sparse_actions:
+            return super().get_queryset()
+        # Столбцы и связи выбираются под поля ответа, лишних JOIN нет
+        serializer_class = self.get_serializer_class()
+        return shape_queryset(
+            MountainPass.objects.all(),
+            serializer_class,
+            self.sparse_fields or serializer_class.Meta.fields,
+            extra=('version',) if self.action == 'retrieve' else (),
+            prefetch_querysets={'images': self.images_queryset},
+        )
 
     def get_serializer_class(self):
         """Выбор сериализатора в зависимости от действия"""
@@ -31,10 +129,15 @@ class MountainPassViewSet(viewsets.ModelViewSet):
             return MountainPassCreateSerializer
         elif self.action == 'update' or self.action == 'partial_update':
             return MountainPassUpdateSerializer
-        elif self.action == 'list':
+        elif self.action == 'list' and self.sparse_fields is None:
             return MountainPassListSerializer
         return MountainPassDetailSerializer
 
+    def get_serializer(self, *args, **kwargs):
+        if self.sparse_fields is not None:
+            kwargs['fields'] = self.sparse_fields
+        return super().get_serializer(*args, **kwargs)
+
     def create(self, request, *args, **kwargs):
         """POST /submitData/ - создание нового перевала"""
         try:
@@ -44,7 +147,7 @@ class MountainPassViewSet(viewsets.ModelViewSet):
 
             headers = self.get_success_headers(serializer.data)
 
-            logger.info(f"Создан новый перевал: {serializer.data.get('title')}")
+            logger.info("Создан новый перевал: %s", serializer.data.get('title'))
 
             return Response(
                 {
@@ -56,7 +159,7 @@ class MountainPassViewSet(viewsets.ModelViewSet):
                 headers=headers
             )
         except serializers.ValidationError as e:
-            logger.error(f"Ошибка валидации при создании перевала: {str(e)}")
+            logger.error("Ошибка валидации при создании перевала: %s", e)
             return Response(
                 {
                     'status': 400,
@@ -66,7 +169,7 @@ class MountainPassViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         except Exception as e:
-            logger.error(f"Ошибка при создании перевала: {str(e)}")
+            logger.error("Ошибка при создании перевала: %s", e)
             return Response(
                 {
                     'status': 500,
@@ -76,19 +179,47 @@ class MountainPassViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def get_detail_instance(self):
+        """Перевал из рабочей таблицы или, после archive_passes, из архива"""
+        try:
+            return self.get_object()
+        except Http404:
+            instance = get_archived(self.kwargs['pk'])
+            if instance is None:
+                raise
+            return instance
+
     def retrieve(self, request, *args, **kwargs):
         """GET /submitData/<id>/ - получение перевала по ID"""
         try:
-            instance = self.get_object()
+            pk = str(kwargs['pk'])
+            if self.sparse_fields is None and pk.isdigit():
+                # Полный ответ кэшируется, повторный запрос не обращается к БД
+                entries, generations = detail_cache.lookup([int(pk)])
+                entry = entries.get(int(pk))
+                if entry is None:
+                    instance = self.get_detail_instance()
+                    entry = detail_cache.store([instance], generations)[instance.pk]
+                headers = {'ETag': entry['etag']}
+                if etag_matches(request, entry['etag']):
+                    return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+                return Response(entry['data'], headers=headers)
+
+            instance = self.get_detail_instance()
+            headers = {'ETag': instance.etag}
+            if etag_matches(request, instance.etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
             serializer = self.get_serializer(instance)
-            return Response(serializer.data)
+            return Response(serializer.data, headers=headers)
         except Http404:
             return Response(
                 {'error': 'Запись не найдена'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        except UnknownFields as e:
+            return Response({'error': str(e.detail)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            logger.error(f"Ошибка при получении перевала: {str(e)}")
+            logger.error("Ошибка при получении перевала: %s", e)
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -109,17 +240,27 @@ class MountainPassViewSet(viewsets.ModelViewSet):
                 )
 
             serializer = self.get_serializer(instance, data=request.data, partial=True)
+            serializer.context['expected_version'] = expected_version(request, instance)
             serializer.is_valid(raise_exception=True)
             self.perform_update(serializer)
 
-            logger.info(f"Перевал {instance.id} обновлен")
+            logger.info("Перевал %s обновлен", instance.id)
 
             return Response(
                 {
                     'state': 1,
                     'message': 'Запись успешно обновлена'
                 },
-                status=status.HTTP_200_OK
+                status=status.HTTP_200_OK,
+                headers={'ETag': instance.etag}
+            )
+        except (PreconditionFailed, PreconditionRequired, EditConflict) as e:
+            return Response(
+                {
+                    'state': 0,
+                    'message': str(e.detail)
+                },
+                status=e.status_code
             )
         except serializers.ValidationError as e:
             return Response(
@@ -131,7 +272,7 @@ class MountainPassViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         except Exception as e:
-            logger.error(f"Ошибка при обновлении перевала: {str(e)}")
+            logger.error("Ошибка при обновлении перевала: %s", e)
             return Response(
                 {
                     'state': 0,
@@ -145,18 +286,35 @@ class MountainPassViewSet(viewsets.ModelViewSet):
         """PATCH /submitData/<id>/status/ - обновление статуса"""
         try:
             instance = self.get_object()
-            serializer = StatusUpdateSerializer(instance, data=request.data, partial=True)
+            serializer = StatusUpdateSerializer(
+                instance,
+                data=request.data,
+                partial=True,
+                context={
+                    'expected_version': expected_version(request, instance),
+                    'actor': str(request.user) if request.user.is_authenticated else 'api',
+                }
+            )
             serializer.is_valid(raise_exception=True)
             serializer.save()
 
-            logger.info(f"Статус перевала {instance.id} изменен на {instance.status}")
+            logger.info("Статус перевала %s изменен на %s", instance.id, instance.status)
 
             return Response(
                 {
                     'state': 1,
                     'message': 'Статус успешно обновлен'
                 },
-                status=status.HTTP_200_OK
+                status=status.HTTP_200_OK,
+                headers={'ETag': instance.etag}
+            )
+        except (PreconditionFailed, PreconditionRequired, EditConflict) as e:
+            return Response(
+                {
+                    'state': 0,
+                    'message': str(e.detail)
+                },
+                status=e.status_code
             )
         except serializers.ValidationError as e:
             return Response(
@@ -168,7 +326,7 @@ class MountainPassViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         except Exception as e:
-            logger.error(f"Ошибка при обновлении статуса: {str(e)}")
+            logger.error("Ошибка при обновлении статуса: %s", e)
             return Response(
                 {
                     'state': 0,
@@ -177,21 +335,76 @@ class MountainPassViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=False, methods=['get', 'post'])
+    def batch(self, request):
+        """
+        GET /submitData/batch/?ids=1,2,3 или POST {"ids": [1, 2, 3]} - полные
+        данные нескольких перевалов за один запрос. Найденные в кэше не читаются
+        из БД, остальные загружаются вместе (select_related и один prefetch).
+        """
+        raw = request.data.get('ids') if request.method == 'POST' else request.query_params.get('ids')
+        try:
+            ids = parse_ids(raw)
+        except ValueError as e:
+            return Response({'state': 0, 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        entries, generations = detail_cache.lookup(ids)
+        missing = [pk for pk in ids if pk not in entries]
+        if missing:
+            found = list(self.queryset.filter(pk__in=missing))
+            archived = set(missing) - {mountain_pass.pk for mountain_pass in found}
+            if archived:
+                found += archived_passes(archived)
+            entries.update(detail_cache.store(found, generations))
+
+        results = {
+            str(pk): entries[pk]['data'] if pk in entries else None
+            for pk in ids
+        }
+        return Response({
+            'count': len(entries),
+            'results': results,
+            'not_found': [pk for pk in ids if pk not in entries],
+        })
 
-class UserPassesListView(ListAPIView):
-    """GET /submitData/?user__email=<email> - перевалы пользователя"""
+    @action(detail=True, methods=['get'])
+    def history(self, request, pk=None):
+        """GET /submitData/<id>/history/ - история смен статуса"""
+        if not pass_exists(pk):
+            return Response(
+                {'error': 'Запись не найдена'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        serializer = PassStatusHistorySerializer(pass_timeline(pk), many=True)
+        return Response({'id': int(pk), 'history': serializer.data})
+
+    @action(detail=False, methods=['get'], url_path='moderation-stats')
+    def moderation_stats(self, request):
+        """GET /submitData/moderation-stats/?days=30 - смены статуса по дням"""
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            days = 0
+        if not 1 <= days <= 366:
+            return Response(
+                {'state': 0, 'message': 'days должен быть от 1 до 366'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({'days': days, 'results': daily_moderation_rates(days)})
+
+
+class UserPassesListView(ReplicaReadMixin, ListAPIView):
+    """GET /submitData/user_passes/?user__email=<email> - перевалы пользователя"""
     permission_classes = [AllowAny]
     serializer_class = MountainPassListSerializer
+    pagination_class = KnownCountPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['user__email']
 
     def get_queryset(self):
-        email = self.request.query_params.get('user__email', None)
-        if email:
-            return MountainPass.objects.filter(
-                user__email=email
-            ).select_related('user', 'coords', 'level').order_by('-add_time')
-        return MountainPass.objects.none()
+        return MountainPass.objects.filter(
+            user=self.user
+        ).select_related('user', 'coords', 'level').order_by('-add_time')
 
     def list(self, request, *args, **kwargs):
         try:
@@ -202,36 +415,279 @@ class UserPassesListView(ListAPIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            if not User.objects.filter(email=email).exists():
+            self.user = User.objects.filter(email=email).select_related('pass_stats').first()
+            if self.user is None:
                 return Response(
                     {'error': 'Пользователь с указанным email не найден'},
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            queryset = self.filter_queryset(self.get_queryset())
-
-            if not queryset.exists():
+            # Число перевалов берётся из счётчиков пользователя, без COUNT
+            counts = user_pass_counts(self.user)
+            if not counts['total']:
                 return Response(
-                    {'count': 0, 'results': []},
+                    {'count': 0, 'results': [], 'counts': counts},
                     status=status.HTTP_200_OK
                 )
 
-            page = self.paginate_queryset(queryset)
-            if page is not None:
-                serializer = self.get_serializer(page, many=True)
-                return self.get_paginated_response(serializer.data)
-
-            serializer = self.get_serializer(queryset, many=True)
+            queryset = self.filter_queryset(self.get_queryset())
+            if counts['accepted'] or counts['rejected']:
+                # Завершённые перевалы могли уйти в архив; фильтры те же, что у рабочей таблицы
+                queryset = UserPassList(
+                    queryset, self.filter_queryset(ArchivedPass.objects.filter(user=self.user))
+                )
+            if set(request.query_params) <= {'user__email', self.paginator.page_query_param}:
+                # Без других фильтров число перевалов известно из счётчиков
+                self.paginator.known_count = counts['total']
 
-            logger.info(f"Запрошены перевалы пользователя {email}")
+            logger.info("Запрошены перевалы пользователя %s", email)
 
-            return Response({
-                'count': len(serializer.data),
-                'results': serializer.data
-            })
+            page = self.paginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            response = self.get_paginated_response(serializer.data)
+            response.data['counts'] = counts
+            return response
         except Exception as e:
-            logger.error(f"Ошибка при получении перевалов пользователя: {str(e)}")
+            logger.error("Ошибка при получении перевалов пользователя: %s", e)
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+
+@require_GET
+async def pass_events(request):
+    """
+    GET /submitData/events/?email=<email> или ?ids=1,2 - поток изменений
+    статуса перевалов (Server-Sent Events) вместо периодического опроса
+    """
+    if not isinstance(request, ASGIRequest):
+        # Под WSGI Django дочитывает асинхронный поток целиком: бесконечный
+        # генератор занял бы воркер навсегда
+        return JsonResponse(
+            {'state': 0, 'message': 'Поток событий доступен только при запуске через ASGI'},
+            status=status.HTTP_501_NOT_IMPLEMENTED
+        )
+
+    email = request.GET.get('email')
+    ids = request.GET.get('ids')
+    if bool(email) == bool(ids):
+        return JsonResponse(
+            {'state': 0, 'message': 'Укажите email или ids'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if email:
+        user = await User.objects.filter(email=email).afirst()
+        if user is None:
+            return JsonResponse(
+                {'state': 0, 'message': 'Пользователь с указанным email не найден'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        subscription = Subscription(user_id=user.pk)
+        snapshot = MountainPass.objects.filter(user=user)
+    else:
+        try:
+            pass_ids = {int(value) for value in ids.split(',') if value.strip()}
+        except ValueError:
+            return JsonResponse(
+                {'state': 0, 'message': 'ids должны быть числами через запятую'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not pass_ids or len(pass_ids) > settings.PASS_EVENTS_MAX_IDS:
+            return JsonResponse(
+                {'state': 0, 'message': f"Можно подписаться на 1-{settings.PASS_EVENTS_MAX_IDS} перевалов"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        subscription = Subscription(pass_ids=pass_ids)
+        snapshot = MountainPass.objects.filter(pk__in=pass_ids)
+
+    response = StreamingHttpResponse(
+        stream_events(subscription, snapshot),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_GET
+def api_schema(request, format):
+    """
+    GET /swagger.json, /swagger.yaml - схема OpenAPI из файла, сгенерированного
+    один раз на версию кода, с долгим кэшированием и проверкой ETag
+    """
+    body, etag = get_document(format)
+    headers = {'ETag': etag, 'Cache-Control': f"public, max-age={settings.PASS_SCHEMA_MAX_AGE}"}
+    if etag_matches(request, etag):
+        return HttpResponseNotModified(headers=headers)
+    return HttpResponse(body, content_type=FORMATS[format], headers=headers)
+
+
+@require_GET
+def api_docs(request, ui):
+    """GET /swagger/, /redoc/ - интерфейс документации"""
+    return HttpResponse(render_docs_page(request, ui), content_type='text/html; charset=utf-8')
+
+
+class PassStatsView(APIView):
+    """GET /stats/?days=30 - статистика перевалов по предрасчитанным счётчикам"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            days = 0
+        if not 1 <= days <= 366:
+            return Response(
+                {'state': 0, 'message': 'days должен быть от 1 до 366'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(read_stats(days))
+
+
+class DatabasePoolStatsView(APIView):
+    """GET /health/db/ - состояние соединений с БД процесса (для администраторов)"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        data = pool_stats()
+        if settings.PASS_READ_REPLICAS:
+            data['replicas'] = {
+                'configured': settings.PASS_READ_REPLICAS,
+                'in_rotation': replica_set.available(),
+            }
+        return Response(data)
+
+
+class UploadSlotsView(APIView):
+    """POST /uploads/slots/ - подписанные URL для загрузки изображений в хранилище"""
+    permission_classes = [AllowAny]
+    throttle_scope = 'upload-slots'
+
+    def post(self, request, *args, **kwargs):
+        if not hasattr(pass_image_storage(), 'presigned_url'):
+            return Response(
+                {
+                    'status': 400,
+                    'message': 'Прямая загрузка изображений не настроена'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = UploadSlotRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {
+                    'status': 400,
+                    'message': 'Ошибка валидации',
+                    'errors': serializer.errors
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        slots = serializer.create_slots()
+        logger.info("Выданы URL для загрузки: %s", len(slots))
+        return Response({'status': 200, 'slots': slots}, status=status.HTTP_200_OK)
+
+
+
+class UploadSessionViewSet(viewsets.GenericViewSet):
+    """
+    Возобновляемая загрузка изображения:
+    POST /uploads/ - создать сессию,
+    HEAD/GET /uploads/<id>/ - узнать полученное смещение,
+    PATCH /uploads/<id>/ - дописать часть с заголовком Upload-Offset,
+    POST /uploads/<id>/finalize/ - прикрепить файл к перевалу.
+    """
+    permission_classes = [AllowAny]
+    queryset = UploadSession.objects.select_related('mountain_pass')
+    serializer_class = UploadSessionSerializer
+    lookup_value_regex = '[0-9a-f-]{36}'
+
+    def _offset_headers(self, session):
+        return {
+            'Upload-Offset': str(session.offset),
+            'Upload-Length': str(session.size),
+            'Cache-Control': 'no-store',
+        }
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {
+                    'status': 400,
+                    'message': 'Ошибка валидации',
+                    'errors': serializer.errors
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        session = serializer.save()
+        logger.info("Начата загрузка %s для перевала %s", session.pk, session.mountain_pass_id)
+        return Response(
+            {
+                'status': 200,
+                'id': session.pk,
+                'offset': session.offset
+            },
+            status=status.HTTP_200_OK,
+            headers=self._offset_headers(session)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        session = self.get_object()
+        return Response(
+            self.get_serializer(session).data,
+            headers=self._offset_headers(session)
+        )
+
+    def partial_update(self, request, *args, **kwargs):
+        session = self.get_object()
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.headers['Content-Length'])
+        except (KeyError, ValueError):
+            return Response(
+                {'error': 'Нужны заголовки Upload-Offset и Content-Length'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            append_chunk(session, offset, request.stream, length)
+        except UploadOffsetConflict as e:
+            return Response(
+                {'error': str(e), 'offset': e.offset},
+                status=status.HTTP_409_CONFLICT,
+                headers=self._offset_headers(session)
+            )
+        except serializers.ValidationError as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(status=status.HTTP_204_NO_CONTENT, headers=self._offset_headers(session))
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        session = self.get_object()
+        try:
+            image = finalize_upload(session)
+        except serializers.ValidationError as e:
+            return Response(
+                {
+                    'status': 400,
+                    'message': 'Ошибка валидации',
+                    'errors': e.detail
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        logger.info("Загрузка %s завершена, изображение %s", session.pk, image.pk)
+        return Response(
+            {
+                'status': 200,
+                'message': 'Изображение добавлено',
+                'id': image.pk
+            },
+            status=status.HTTP_200_OK
+        )